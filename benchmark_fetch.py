@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark fetch_enhanced_dashboard_data.py against the local mock Tableau server
+Reports wall time, request count and peak memory per scenario
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_tableau_server import MockTableauServer, build_catalog
+
+FETCHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fetch_enhanced_dashboard_data.py')
+
+# name, workbooks, views per workbook, latency ms, error rate, 429 rate, extra fetcher args
+SCENARIOS = [
+    ('100 workbooks', 100, 5, 20, 0.0, 0.0, []),
+    ('100 workbooks, bulk views', 100, 5, 20, 0.0, 0.0, ['--bulk-views']),
+    ('100 workbooks, 5% 5xx + 5% 429', 100, 5, 20, 0.05, 0.05, []),
+    ('1k workbooks', 1000, 5, 20, 0.0, 0.0, []),
+    ('1k workbooks, bulk views', 1000, 5, 20, 0.0, 0.0, ['--bulk-views']),
+    ('10k workbooks, bulk views', 10000, 5, 20, 0.0, 0.0, ['--bulk-views']),
+]
+
+def run_fetcher(server, extra_args, workdir):
+    """Run the fetcher in a subprocess; return (wall seconds, exit code, peak RSS in MB)"""
+    env = dict(os.environ, TABLEAU_SERVER=server.url, TABLEAU_SITE_NAME='',
+               TABLEAU_PAT_NAME='mock', TABLEAU_PAT_VALUE='mock')
+    cmd = [sys.executable, FETCHER, '--output', os.path.join(workdir, 'out.json')] + extra_args
+
+    # stderr goes to a file - a pipe nobody reads during wait4 would hang a chatty failing run
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+        # wait4 gives this child's own resource usage (ru_maxrss is KB on Linux, bytes on macOS)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            stderr.seek(0)
+            print(stderr.read().decode(errors='replace'), file=sys.stderr)
+
+    peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return elapsed, process.returncode, peak_mb
+
+def run_scenario(name, workbooks, views, latency_ms, error_rate, rate_limit_rate, extra_args, fetcher_args):
+    catalog = build_catalog(workbooks, views)
+    server = MockTableauServer(catalog, latency_ms=latency_ms, error_rate=error_rate,
+                               rate_limit_rate=rate_limit_rate).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            elapsed, returncode, peak_mb = run_fetcher(server, extra_args + fetcher_args, workdir)
+            dashboards = 0
+            if returncode == 0:
+                with open(os.path.join(workdir, 'out.json')) as f:
+                    data = json.load(f)
+                dashboards = len(data['production']) + len(data['playground'])
+    finally:
+        server.stop()
+
+    failed = sum(count for key, count in server.stats.items() if key != 'requests' and not key.endswith(' 200'))
+    return {
+        'scenario': name,
+        'workbooks': workbooks,
+        'wall_seconds': round(elapsed, 2),
+        'requests': server.stats['requests'],
+        'failed_requests': failed,
+        'peak_rss_mb': round(peak_mb, 1),
+        'dashboards': dashboards,
+        'exit_code': returncode
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard fetcher against a mock Tableau server")
+    parser.add_argument('--scenario', action='append',
+                        help="Only run scenarios whose name contains this text (repeatable)")
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file")
+    parser.add_argument('fetcher_args', nargs=argparse.REMAINDER,
+                        help="Extra arguments passed to the fetcher, after --")
+    args = parser.parse_args()
+    fetcher_args = [a for a in args.fetcher_args if a != '--']
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or any(f in s[0] for f in args.scenario)]
+    results = []
+    print(f"{'Scenario':<34} {'Wall s':>8} {'Requests':>9} {'Failed':>7} {'Peak MB':>8} {'Dashboards':>10}")
+    print("-" * 82)
+    for scenario in scenarios:
+        result = run_scenario(*scenario, fetcher_args)
+        results.append(result)
+        status = '' if result['exit_code'] == 0 else f"  ❌ exit {result['exit_code']}"
+        print(f"{result['scenario']:<34} {result['wall_seconds']:>8.2f} {result['requests']:>9} "
+              f"{result['failed_requests']:>7} {result['peak_rss_mb']:>8.1f} {result['dashboards']:>10}{status}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.json_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate_enhanced_html.py rendering on synthetic catalogs of growing size
+Reports time per card, the log-log scaling exponent (1.0 = linear), peak Python memory and the
+time of a rebuild from a warm fragment cache (nothing changed)
+"""
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from fragment_cache import FragmentCache
+from generate_enhanced_html import format_date, render_page, template_version
+
+DEFAULT_SIZES = [1000, 2500, 5000, 10000, 20000]
+WORDS = ['Hourly', 'Daily', 'Revenue', 'Triage', 'Margin', 'Spend', 'Publisher', 'Advertiser',
+         'ROC', 'Health', 'Trend', 'Supply', 'Alerts', 'Investigation', 'CPA']
+
+def make_record(i, rng):
+    """One enhanced-JSON record shaped like the fetcher's output"""
+    name = f"{' '.join(rng.sample(WORDS, 2))} {i}"
+    views = [{'name': f"Sheet {v + 1}", 'id': f"view-{i}-{v}", 'url': f"https://tableau.example.com/#/views/wb{i}/Sheet{v + 1}",
+              'viewCount': rng.randrange(500)} for v in range(rng.randrange(1, 12))]
+    record = {
+        'id': f"wb-{i}",
+        'name': name,
+        'description': f"{name} tracking and monitoring.",
+        'project': 'ROC',
+        'owner': rng.choice(['mor.h', 'guy.d', 'yahel.o']),
+        'created': '2025-01-01T10:00:00Z',
+        'updated': f"2025-06-{1 + rng.randrange(28):02d}T10:00:00Z",
+        'tags': ['roc'] if i % 5 == 0 else [],
+        'views': views,
+        'data_sources': [{'name': f"{name} Source {c + 1}", 'type': rng.choice(['vertica', 'bigquery'])}
+                         for c in range(rng.randrange(1, 4))],
+        'sheet_count': len(views),
+        'total_views': sum(view['viewCount'] for view in views),
+        'url': views[0]['url']
+    }
+    if i % 2:
+        record['trend'] = {'views_7d': rng.randrange(100), 'per_day_7d': 1.5, 'views_30d': rng.randrange(400),
+                           'per_day_30d': 2.25, 'history_days': 40.0, 'stale': i % 7 == 0}
+    return record
+
+def make_catalog(size, seed=42):
+    rng = random.Random(seed)
+    records = [make_record(i, rng) for i in range(size)]
+    return records[:size // 2], records[size // 2:]
+
+def render(production, playground, path, cache=None):
+    with open(path, 'w') as f:
+        render_page(f, production, playground, format_date('2025-06-28T17:00:00'), cache)
+    if cache is not None:
+        cache.save()
+
+def measure(size, path, repeat):
+    production, playground = make_catalog(size)
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(production, playground, path)
+        best = min(best, time.perf_counter() - start)
+
+    cache_path = os.path.join(os.path.dirname(path), f"cache-{size}.sqlite")
+    render(production, playground, path, FragmentCache(cache_path, template_version()))
+    warm = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(production, playground, path, FragmentCache(cache_path, template_version()))
+        warm = min(warm, time.perf_counter() - start)
+
+    # Separate pass: tracemalloc slows rendering down, so it is not part of the timing
+    tracemalloc.start()
+    render(production, playground, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'cards': size, 'seconds': round(best, 4), 'us_per_card': round(1e6 * best / size, 1),
+            'warm_cache_seconds': round(warm, 4),
+            'peak_render_mb': round(peak / (1024 * 1024), 2), 'output_mb': round(os.path.getsize(path) / (1024 * 1024), 1)}
+
+def scaling_exponent(results):
+    """Least-squares slope of log(seconds) against log(cards)"""
+    xs = [math.log(r['cards']) for r in results]
+    ys = [math.log(r['seconds']) for r in results]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sum((x - mean_x) ** 2 for x in xs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard HTML generator on synthetic catalogs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Catalog sizes in cards (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per size, best is kept (default: 3)")
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'Cards':>8} {'Seconds':>9} {'µs/card':>9} {'Warm s':>9} {'Peak MB':>9} {'Output MB':>10}")
+    print("-" * 59)
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            result = measure(size, os.path.join(workdir, 'out.html'), args.repeat)
+            results.append(result)
+            print(f"{result['cards']:>8} {result['seconds']:>9.3f} {result['us_per_card']:>9.1f} "
+                  f"{result['warm_cache_seconds']:>9.3f} {result['peak_render_mb']:>9.2f} {result['output_mb']:>10.1f}")
+
+    if len(results) > 1:
+        exponent = scaling_exponent(results)
+        verdict = "✅ linear" if exponent < 1.15 else "⚠️ superlinear"
+        print(f"\n📈 Scaling exponent: {exponent:.2f} ({verdict})")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to: {args.json_path}")
+
+if __name__ == '__main__':
+    main()
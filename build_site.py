@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Build the deployable site for the nginx image
+Every page is rendered from its source - the dashboards (generate_enhanced_html.py) and the
+directory pages (directory_pages.py) from their JSON, the knowledge base from its HTML - in
+parallel worker processes. The shared theme and scripts go into one content-hashed CSS/JS bundle
+all pages link, the pages' own inline CSS/JS into hashed files of their own, every text artifact
+is precompressed (gzip, plus brotli when installed) and an nginx config is written that caches
+hashed files for a year and revalidates pages and data (ETag -> 304) after a short max-age.
+
+    dist/
+        site/                   document root
+            index.html          the dashboards page
+            assets/             <sha256[:16]>.css / .js - the shared bundle and page assets, immutable
+            thumbnails/         content-hashed previews (thumbnails.py) - immutable
+            panels/             content-hashed sheet/data-source lists of the cards - immutable
+        nginx.conf
+"""
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    # Without it only the .gz files are written
+    brotli = None
+
+import directory_pages
+from fragment_cache import DEFAULT_CACHE_PATH, FragmentCache
+from generate_enhanced_html import (DEFAULT_INPUT, PANELS_DIR, format_date, load_dashboards, render_page,
+                                    render_virtual_page, template_version, write_panels)
+from thumbnails import DEFAULT_THUMBNAIL_DIR, THUMBNAIL_FILE
+
+DEFAULT_OUTPUT = 'dist'
+DEFAULT_SERVER_NAME = 'roc-dashboards.taboolasyndication.com'
+DEFAULT_HTML_MAX_AGE = 60
+
+# The shared bundle: every page links it instead of carrying its own copy
+BUNDLE_STYLESHEET = 'site.css'
+BUNDLE_SCRIPTS = ['search-index.js', 'panels.js', 'directory.js']
+
+# (deployed name, source) of the hand-written pages; their links to the shared files become the bundle
+PAGES = [
+    ('knowledge-base.html', 'knowledge-base.html'),
+]
+# Served under their own names: loaded by name from the worker, or fetched as data
+FILES = ['search-index.js', 'search-worker.js', 'all_dashboards_data_enhanced.json', 'roc_kiwi_jobs.json',
+         'roc_alerts.json']
+# (directory, file name pattern, label) written by the generators with content-hash names
+HASHED_DIRS = [
+    (DEFAULT_THUMBNAIL_DIR, THUMBNAIL_FILE, 'thumbnails'),
+]
+
+ASSET_DIR = 'assets'
+COMPRESSIBLE = {'.html', '.css', '.js', '.json', '.svg'}
+
+INLINE_STYLE = re.compile(r'<style>(.*?)</style>', re.S)
+# Only plain scripts - the JSON payloads and the worker source stay in the page
+INLINE_SCRIPT = re.compile(r'<script>(.*?)</script>', re.S)
+SHARED_SCRIPT = re.compile(r'<script src="([^"]+)"></script>')
+
+SECURITY_HEADERS = [
+    ('X-Frame-Options', 'SAMEORIGIN'),
+    ('X-Content-Type-Options', 'nosniff'),
+    ('X-XSS-Protection', '1; mode=block'),
+]
+
+NGINX_TEMPLATE = '''# Generated by build_site.py - edit the template there
+server {{
+    listen 80;
+    server_name {server_name};
+
+    root /usr/share/nginx/html;
+    index index.html;
+
+    # Serve the .gz files written at build time; anything else is compressed on the fly
+    gzip on;
+    gzip_static on;
+    gzip_vary on;
+    gzip_types text/css application/javascript application/json image/svg+xml;
+{brotli}
+    # add_header in a location drops the server-level headers, so each location repeats them
+
+    # Content-hashed names change whenever the content does
+    location /{asset_dir}/ {{
+        add_header Cache-Control "public, max-age=31536000, immutable";
+{security_headers}
+    }}
+
+    location /{thumbnail_dir}/ {{
+        add_header Cache-Control "public, max-age=31536000, immutable";
+{security_headers}
+    }}
+
+    location /{panels_dir}/ {{
+        add_header Cache-Control "public, max-age=31536000, immutable";
+{security_headers}
+    }}
+
+    # Pages and data keep their names: reuse briefly, then revalidate with the ETag (304)
+    location / {{
+        try_files $uri $uri/ /index.html;
+        add_header Cache-Control "public, max-age={html_max_age}, must-revalidate";
+{security_headers}
+    }}
+}}
+'''
+
+def write_asset(site, content, extension):
+    """Store content under its hash -> URL relative to the site root"""
+    data = content.encode('utf-8')
+    filename = hashlib.sha256(data).hexdigest()[:16] + extension
+    path = os.path.join(site, ASSET_DIR, filename)
+    if not os.path.exists(path):
+        # Workers may write the same asset at once - each renames a complete file into place
+        with open(f"{path}.{os.getpid()}.tmp", 'wb') as f:
+            f.write(data)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+    return f"{ASSET_DIR}/{filename}"
+
+def write_bundle(site):
+    """Shared stylesheet and scripts as one hashed CSS and one hashed JS file -> {'css': url, 'js': url}"""
+    with open(BUNDLE_STYLESHEET, 'r', encoding='utf-8') as f:
+        css = f.read()
+    scripts = []
+    for name in BUNDLE_SCRIPTS:
+        with open(name, 'r', encoding='utf-8') as f:
+            scripts.append(f.read())
+    return {'css': write_asset(site, css, '.css'), 'js': write_asset(site, '\n'.join(scripts), '.js')}
+
+def link_bundle(html, bundle):
+    """Point a hand-written page's links to the shared files at the bundle"""
+    html = html.replace(f'<link rel="stylesheet" href="{BUNDLE_STYLESHEET}">',
+                        f'<link rel="stylesheet" href="{bundle["css"]}">')
+    linked = False
+
+    def script(match):
+        nonlocal linked
+        if match.group(1) not in BUNDLE_SCRIPTS:
+            return match.group(0)
+        # The first shared script brings the whole bundle, the others go
+        if linked:
+            return ''
+        linked = True
+        return f'<script src="{bundle["js"]}"></script>'
+
+    return SHARED_SCRIPT.sub(script, html)
+
+def extract_assets(html, site):
+    """Replace inline <style> and <script> blocks with links to hashed files -> (html, count)"""
+    count = 0
+
+    def style(match):
+        nonlocal count
+        count += 1
+        return f'<link rel="stylesheet" href="{write_asset(site, match.group(1), ".css")}">'
+
+    def script(match):
+        nonlocal count
+        count += 1
+        return f'<script src="{write_asset(site, match.group(1), ".js")}"></script>'
+
+    html = INLINE_STYLE.sub(style, html)
+    html = INLINE_SCRIPT.sub(script, html)
+    return html, count
+
+def write_page(site, name, html):
+    """Move a page's inline blocks to assets/ and write it -> progress line"""
+    html, count = extract_assets(html, site)
+    with open(os.path.join(site, name), 'w', encoding='utf-8') as f:
+        f.write(html)
+    return f"  📄 {name}: {len(html) / 1024:.0f} KB, {count} inline blocks moved to {ASSET_DIR}/"
+
+# Page builders - each runs in a worker process and returns its progress lines
+
+def build_dashboards(site, bundle, path, mode, cache_path):
+    production, playground, last_updated = load_dashboards(path)
+    panels, _ = write_panels(production + playground, os.path.join(site, PANELS_DIR))
+    out = io.StringIO()
+    cache = None
+    if mode == 'virtual':
+        render_virtual_page(out, production, playground, format_date(last_updated), panels, bundle)
+    else:
+        cache = FragmentCache(cache_path, template_version()) if cache_path else None
+        render_page(out, production, playground, format_date(last_updated), cache, panels, bundle)
+    lines = [write_page(site, 'index.html', out.getvalue()),
+             f"     {len(production) + len(playground)} dashboards ({mode}), "
+             f"{sum(1 for url in panels if url)} panel shards in {PANELS_DIR}/"]
+    if cache is not None:
+        cache.save()
+        cache.close()
+        lines.append(f"     🧩 Fragment cache: {cache.hits} hits, {cache.misses} re-rendered")
+    return lines
+
+def build_directory(site, bundle, name):
+    page = directory_pages.PAGES[name]
+    if not os.path.exists(page['source']):
+        return [f"  ⚠️  Skipping {page['output']}: {page['source']} not found"]
+    records = directory_pages.load_records(name)
+    return [write_page(site, page['output'], directory_pages.render_page(name, records, bundle)),
+            f"     {len(records)} {page['noun']} from {page['source']}"]
+
+def build_page(site, bundle, name, source):
+    if not os.path.exists(source):
+        return [f"  ⚠️  Skipping {name}: {source} not found"]
+    with open(source, 'r', encoding='utf-8') as f:
+        return [write_page(site, name, link_bundle(f.read(), bundle))]
+
+def precompress(path):
+    """Write path.gz (and path.br) next to a text file -> (size, gzip size, brotli size or None)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    # mtime=0 keeps rebuilds byte-identical
+    sizes = [len(data), None, None]
+    variants = [('.gz', 1, gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', 2, brotli.compress(data, quality=11)))
+    for suffix, slot, compressed in variants:
+        # Tiny files can grow; nginx falls back to the original when there is no variant
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            sizes[slot] = len(compressed)
+    return tuple(sizes)
+
+def nginx_config(server_name=DEFAULT_SERVER_NAME, html_max_age=DEFAULT_HTML_MAX_AGE, brotli_static=False):
+    security_headers = '\n'.join(f'        add_header {name} "{value}";' for name, value in SECURITY_HEADERS)
+    return NGINX_TEMPLATE.format(
+        server_name=server_name,
+        html_max_age=html_max_age,
+        asset_dir=ASSET_DIR,
+        thumbnail_dir=DEFAULT_THUMBNAIL_DIR,
+        panels_dir=PANELS_DIR,
+        # Needs the ngx_brotli module, which the stock nginx image doesn't ship
+        brotli='    brotli_static on;\n' if brotli_static else '',
+        security_headers=security_headers
+    )
+
+def format_kb(size):
+    return f"{size / 1024:.1f} KB" if size is not None else '-'
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every page into the hashed, precompressed site and its nginx config")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f"Enhanced dashboards JSON (default: {DEFAULT_INPUT})")
+    parser.add_argument('--mode', choices=['static', 'virtual'], default='static',
+                        help="Dashboards page mode, as in generate_enhanced_html.py (default: static)")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f"Rendered-card cache shared with generate_enhanced_html.py (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true', help="Render every card from scratch")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes for rendering and compressing (default: one per CPU)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"Build directory (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--server-name', default=DEFAULT_SERVER_NAME, help="nginx server_name")
+    parser.add_argument('--html-max-age', type=int, default=DEFAULT_HTML_MAX_AGE,
+                        help=f"Seconds pages and data are reused before revalidating (default: {DEFAULT_HTML_MAX_AGE})")
+    parser.add_argument('--brotli-static', action='store_true',
+                        help="Add brotli_static to the nginx config (needs the ngx_brotli module)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ {args.input} not found - run fetch_enhanced_dashboard_data.py first")
+        sys.exit(1)
+
+    start = time.time()
+    site = os.path.join(args.output, 'site')
+    # Start clean so assets of older builds don't pile up
+    shutil.rmtree(site, ignore_errors=True)
+    os.makedirs(os.path.join(site, ASSET_DIR))
+
+    bundle = write_bundle(site)
+    print(f"📦 Building site in {site} ({args.workers} workers)")
+    print(f"  🎁 Shared bundle: {bundle['css']} + {bundle['js']}")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # The dashboards page is by far the biggest - start it first
+        builds = [executor.submit(build_dashboards, site, bundle, args.input, args.mode,
+                                  None if args.no_cache else args.cache)]
+        builds += [executor.submit(build_directory, site, bundle, name) for name in directory_pages.PAGES]
+        builds += [executor.submit(build_page, site, bundle, name, source) for name, source in PAGES]
+
+        for name in FILES:
+            if os.path.exists(name):
+                shutil.copyfile(name, os.path.join(site, name))
+            else:
+                print(f"  ⚠️  Skipping {name}: not found")
+
+        for directory, pattern, label in HASHED_DIRS:
+            if not os.path.isdir(directory):
+                continue
+            os.makedirs(os.path.join(site, directory))
+            filenames = [filename for filename in os.listdir(directory) if pattern.match(filename)]
+            for filename in filenames:
+                shutil.copyfile(os.path.join(directory, filename), os.path.join(site, directory, filename))
+            print(f"  🗃️  {len(filenames)} {label} in {directory}/")
+
+        for build in builds:
+            for line in build.result():
+                print(line)
+
+        print(f"\n🗜️  Precompressing (gzip{' + brotli' if brotli else ', brotli not installed'})")
+        paths = [os.path.join(directory, filename)
+                 for directory, _, filenames in sorted(os.walk(site))
+                 for filename in sorted(filenames)
+                 if os.path.splitext(filename)[1] in COMPRESSIBLE]
+        totals = [0, 0, 0]
+        for path, (size, gz_size, br_size) in zip(paths, executor.map(precompress, paths, chunksize=64)):
+            totals[0] += size
+            totals[1] += gz_size or size
+            totals[2] += br_size or gz_size or size
+            if os.path.dirname(path) == site:
+                print(f"  {os.path.basename(path):<40} {format_kb(size):>10} {format_kb(gz_size):>10} {format_kb(br_size):>10}")
+    print(f"  {'total (incl. assets)':<40} {format_kb(totals[0]):>10} {format_kb(totals[1]):>10} "
+          f"{format_kb(totals[2]) if brotli else '-':>10}")
+
+    config_path = os.path.join(args.output, 'nginx.conf')
+    with open(config_path, 'w') as f:
+        f.write(nginx_config(args.server_name, args.html_max_age, args.brotli_static))
+    print(f"\n✅ Site built in {time.time() - start:.1f}s, nginx config written to {config_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Declarative inclusion rules for which Tableau workbooks end up in the portal
+Rules live in catalog_rules.json; each top-level key is a category:
+
+    "playground": {
+        "projects": ["Playground", ...],          # pushed down as projectName:in:[...]
+        "owners": ["mor.h"],                       # pushed down as ownerName:in:[...]
+        "name": "regex",                           # keep only matching names (client-side)
+        "exclude": [{"owners": [...], "projects": [...], "name": "regex",
+                     "unless_name": "regex", "reason": "..."}]
+    }
+
+Whatever the Tableau REST filter= syntax can express is sent to the server; the rest is
+compiled once into a matcher that runs right after the listing, before any per-workbook call.
+"""
+import json
+import os
+import re
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog_rules.json')
+
+def compile_pattern(pattern):
+    return re.compile(pattern, re.IGNORECASE) if pattern else None
+
+class ExcludeRule:
+    def __init__(self, spec):
+        self.owners = frozenset(spec.get('owners', [])) or None
+        self.projects = frozenset(spec.get('projects', [])) or None
+        self.name = compile_pattern(spec.get('name'))
+        self.unless_name = compile_pattern(spec.get('unless_name'))
+        self.reason = spec.get('reason', 'excluded by rule')
+
+    def matches(self, owner, project, name):
+        if self.owners is not None and owner not in self.owners:
+            return False
+        if self.projects is not None and project not in self.projects:
+            return False
+        if self.name is not None and not self.name.search(name):
+            return False
+        if self.unless_name is not None and self.unless_name.search(name):
+            return False
+        return True
+
+class CategoryRules:
+    def __init__(self, name, spec):
+        self.name = name
+        self.projects = list(spec.get('projects', []))
+        self.owners = list(spec.get('owners', []))
+        self.name_pattern = compile_pattern(spec.get('name'))
+        self.excludes = [ExcludeRule(rule) for rule in spec.get('exclude', [])]
+        self.project_set = frozenset(self.projects)
+        self.owner_set = frozenset(self.owners)
+
+    def exclusion_reason(self, wb):
+        """Why a workbook listed for this category is left out, or None to keep it"""
+        owner = wb.get('owner', {}).get('name', '')
+        project = wb.get('project', {}).get('name', '')
+        name = wb.get('name', '')
+
+        if self.project_set and project not in self.project_set:
+            return f"project {project!r} not in {self.name}"
+        if self.owner_set and owner not in self.owner_set:
+            return f"owner {owner!r} not in {self.name}"
+        if self.name_pattern is not None and not self.name_pattern.search(name):
+            return "name doesn't match"
+        for rule in self.excludes:
+            if rule.matches(owner, project, name):
+                return rule.reason
+        return None
+
+class CatalogRules:
+    def __init__(self, config):
+        self.categories = {name: CategoryRules(name, spec) for name, spec in config.items()}
+
+    def __getitem__(self, category):
+        return self.categories[category]
+
+    def project_names(self, categories):
+        """Projects of the given categories, in configured order"""
+        names = []
+        for category in categories:
+            names.extend(p for p in self.categories[category].projects if p not in names)
+        return names
+
+    def rest_filter(self, categories, fields=('projectName', 'ownerName')):
+        """Tableau REST filter= expression selecting a superset of the given categories
+        
+        One listing serves several categories, so a field is only pushed down when every
+        category constrains it (a category without owners needs every owner).
+        """
+        selected = [self.categories[category] for category in categories]
+        clauses = []
+        for field, values in (('projectName', [c.projects for c in selected]),
+                              ('ownerName', [c.owners for c in selected])):
+            if field in fields and values and all(values):
+                merged = []
+                for value_list in values:
+                    merged.extend(v for v in value_list if v not in merged)
+                clauses.append(f"{field}:in:[{','.join(merged)}]")
+        return ','.join(clauses)
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    with open(path, 'r') as f:
+        return CatalogRules(json.load(f))
@@ -80,7 +80,7 @@ case $option in
         docker run -d -p 8080:80 --name roc-dashboards-test ${IMAGE_NAME}:${VERSION}
         echo ""
         echo "✅ Container started!"
-        echo "🌐 Access your dashboard at: http://localhost:8080/roc_dashboards.html"
+        echo "🌐 Access your dashboard at: http://localhost:8080/"
         echo ""
         echo "To stop: docker stop roc-dashboards-test && docker rm roc-dashboards-test"
         ;;
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Table-driven descriptions for workbooks that have none on Tableau
+Rules live in description_rules.json:
+
+    {"id": "hourly", "priority": 10, "fields": ["name"], "keywords": ["hourly"],
+     "description": "Monitors hourly trends ..."}
+
+fields is any of name / sheets / datasources. Keywords are case-insensitive substrings
+("test" also matches "latest"). The lowest priority among all matching rules wins, ties go to
+file order; with no match the project fallback (or the default) is used.
+
+Each field compiles to one regex holding every keyword as an alternative, in priority order,
+so a match reports the best rule starting at that position. Resuming the search one
+character after each match (not after its end) also catches overlapping keywords, so a single
+pass finds the winning rule - and a batch scans the whole catalog's text in one pass.
+"""
+import argparse
+import json
+import os
+import re
+from bisect import bisect_right
+from collections import Counter
+
+DEFAULT_DESCRIPTION_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'description_rules.json')
+
+FIELDS = ('name', 'sheets', 'datasources')
+
+class DescriptionRule:
+    def __init__(self, spec, order):
+        self.id = spec['id']
+        self.priority = spec.get('priority', 0)
+        self.fields = spec.get('fields', ['name'])
+        self.keywords = [keyword.lower() for keyword in spec['keywords']]
+        self.description = spec['description']
+        self.rank = (self.priority, order)
+
+        unknown = set(self.fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Rule {self.id!r}: unknown fields {sorted(unknown)}")
+        if any('\n' in keyword or not keyword for keyword in self.keywords):
+            raise ValueError(f"Rule {self.id!r}: keywords must be non-empty single-line strings")
+
+class DescriptionClassifier:
+    def __init__(self, config):
+        self.rules = [DescriptionRule(spec, order) for order, spec in enumerate(config.get('rules', []))]
+        self.project_fallbacks = config.get('project_fallbacks', {})
+        self.default = config.get('default', "Analytics dashboard for {project} insights and monitoring.")
+
+        # Plain alternation (no groups) keeps the regex engine's fast first-character scan;
+        # the matched keyword maps back to its best-ranked rule
+        self.patterns = {}
+        self.rules_by_keyword = {}
+        for field in FIELDS:
+            keyword_rules = {}
+            for rule in sorted(self.rules, key=lambda r: r.rank):
+                if field in rule.fields:
+                    for keyword in sorted(rule.keywords, key=len, reverse=True):
+                        keyword_rules.setdefault(keyword, rule)
+            if keyword_rules:
+                self.patterns[field] = re.compile('|'.join(re.escape(k) for k in keyword_rules))
+                self.rules_by_keyword[field] = keyword_rules
+
+    def _scan(self, field, texts):
+        """Best (rule, matched keyword) per text, from one pass over all texts joined by newlines"""
+        best = [None] * len(texts)
+        pattern = self.patterns.get(field)
+        if pattern is None:
+            return best
+        keyword_rules = self.rules_by_keyword[field]
+
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+
+        blob = '\n'.join(texts)
+        match = pattern.search(blob)
+        while match:
+            index = bisect_right(starts, match.start()) - 1
+            rule = keyword_rules[match.group()]
+            if best[index] is None or rule.rank < best[index][0].rank:
+                best[index] = (rule, match.group())
+            match = pattern.search(blob, match.start() + 1)
+        return best
+
+    def classify_batch(self, items):
+        """[(name, project, sheet names, datasource names)] -> [(description, explanation)]"""
+        texts = {
+            'name': [name.lower() for name, _, _, _ in items],
+            'sheets': ['\n'.join(sheets).lower() for _, _, sheets, _ in items],
+            'datasources': ['\n'.join(sources).lower() for _, _, _, sources in items],
+        }
+        scans = {field: self._scan(field, texts[field]) for field in FIELDS}
+
+        results = []
+        for index, (_, project, _, _) in enumerate(items):
+            winner = None
+            for field in FIELDS:
+                hit = scans[field][index]
+                if hit and (winner is None or hit[0].rank < winner[1].rank):
+                    winner = (field, hit[0], hit[1])
+
+            if winner:
+                field, rule, keyword = winner
+                results.append((rule.description, {'rule': rule.id, 'field': field, 'keyword': keyword}))
+            elif project in self.project_fallbacks:
+                results.append((self.project_fallbacks[project], {'rule': 'project', 'project': project}))
+            else:
+                results.append((self.default.format(project=project), {'rule': 'default'}))
+        return results
+
+    def classify(self, name, project, sheet_names=(), datasource_names=()):
+        return self.classify_batch([(name, project, list(sheet_names), list(datasource_names))])[0]
+
+def load_description_rules(path=DEFAULT_DESCRIPTION_RULES_PATH):
+    with open(path, 'r') as f:
+        return DescriptionClassifier(json.load(f))
+
+def describe_records(records, classifier):
+    """Fill in description + description_rule for records with no author description, as one batch"""
+    pending = [record for record in records if not record.get('description')]
+    items = [(record['name'], record['project'],
+              [view.get('name', '') for view in record.get('views', [])],
+              [ds.get('name', '') for ds in record.get('data_sources', [])])
+             for record in pending]
+    for record, (description, explanation) in zip(pending, classifier.classify_batch(items)):
+        record['description'] = description
+        record['description_rule'] = explanation
+    return len(pending)
+
+def main():
+    parser = argparse.ArgumentParser(description="Explain which description rule fires for each workbook")
+    parser.add_argument('input', nargs='?', default='all_dashboards_data_enhanced.json',
+                        help="Enhanced dashboards JSON (default: all_dashboards_data_enhanced.json)")
+    parser.add_argument('--rules', default=DEFAULT_DESCRIPTION_RULES_PATH,
+                        help="Description rules (default: description_rules.json)")
+    parser.add_argument('--explain', action='store_true', help="Print the rule that fired for every workbook")
+    args = parser.parse_args()
+
+    with open(args.input, 'r') as f:
+        data = json.load(f)
+    records = [record for category in ('production', 'playground') for record in data.get(category, [])]
+    generated = [record for record in records if record.get('description_rule', {'rule': 'author'})['rule'] != 'author']
+    for record in generated:
+        record['description'] = ''
+    describe_records(generated, load_description_rules(args.rules))
+
+    if args.explain:
+        for record in generated:
+            explanation = record['description_rule']
+            detail = f"{explanation['field']}: {explanation['keyword']!r}" if 'keyword' in explanation else ''
+            print(f"{record['name'][:50]:<50} {explanation['rule']:<14} {detail}")
+        print()
+
+    print(f"📝 {len(generated)} generated descriptions ({len(records) - len(generated)} written by authors)")
+    for rule, count in Counter(record['description_rule']['rule'] for record in generated).most_common():
+        print(f"   {rule:<14} {count:>6}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+// Search, filters and expandable cards of the directory pages (directory_pages.py)
+// Cards are indexed from the page when it loads; does nothing on pages without a #directory-grid.
+(function () {
+    const grid = document.getElementById('directory-grid');
+    if (!grid) return;
+
+    const cards = Array.from(grid.querySelectorAll('.item-card'));
+    const searchInput = document.getElementById('searchInput');
+    const filterButtons = document.querySelectorAll('.filter-btn');
+    const noResults = document.getElementById('noResults');
+    let currentFilter = 'all';
+
+    // Typo-tolerant ranked search in search-worker.js; ids are card positions
+    const searchClient = createSearchClient({
+        docs: cards.map(card => ({
+            title: card.querySelector('.item-title').textContent,
+            tags: Array.from(card.querySelectorAll('.item-badge, .item-tag'), tag => tag.textContent).join(' '),
+            owner: card.dataset.owner || '',
+            description: card.querySelector('.item-description').textContent,
+            details: card.querySelector('.item-details').textContent
+        })),
+        weights: { title: 10, tags: 6, owner: 4, description: 3, details: 2 }
+    }, 'search-worker.js');
+    // Card ids in relevance order from the last search, or null when the search box is empty
+    let ranked = null;
+
+    function updateDisplay() {
+        const rank = ranked && new Map(ranked.map((id, position) => [id, position]));
+        let visibleCount = 0;
+
+        // Best matches first while searching, page order otherwise
+        const order = Array.from(cards.keys());
+        if (rank) {
+            order.sort((a, b) => (rank.has(a) ? rank.get(a) : Infinity) - (rank.has(b) ? rank.get(b) : Infinity) || a - b);
+        }
+        order.forEach(id => grid.appendChild(cards[id]));
+
+        cards.forEach((card, id) => {
+            const matchesSearch = !rank || rank.has(id);
+            const matchesFilter = currentFilter === 'all' || card.dataset.filter === currentFilter;
+            card.style.display = matchesSearch && matchesFilter ? '' : 'none';
+            if (matchesSearch && matchesFilter) visibleCount++;
+        });
+
+        noResults.style.display = visibleCount === 0 ? 'block' : 'none';
+    }
+
+    // Links inside a card open without toggling it
+    grid.addEventListener('click', event => {
+        const card = event.target.closest('.item-card');
+        if (!card || event.target.closest('a')) return;
+        card.classList.toggle('expanded');
+        card.querySelector('.expand-hint').textContent =
+            card.classList.contains('expanded') ? 'Click to collapse ▲' : 'Click for details ▼';
+    });
+
+    searchInput.addEventListener('input', () => {
+        searchClient.query(searchInput.value, ids => {
+            ranked = ids;
+            updateDisplay();
+        });
+    });
+
+    filterButtons.forEach(btn => {
+        btn.addEventListener('click', () => {
+            filterButtons.forEach(b => b.classList.remove('active'));
+            btn.classList.add('active');
+            currentFilter = btn.dataset.filter;
+            updateDisplay();
+        });
+    });
+})();
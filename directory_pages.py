@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Generate the directory pages - ROC alerts and Kiwi jobs - from their JSON files
+Both go through the same page and card templates; site.css styles them and directory.js adds
+search, filters and expandable cards. By default the pages are written next to the JSON and link
+the shared files by name; build_site.py renders them against its hashed bundle instead.
+"""
+import argparse
+import json
+import os
+from html import escape
+
+# Filled with str.format - the values are escaped first, so braces in the data are harmless
+PAGE_HEAD = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <link href="https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@300;400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
+    <link rel="stylesheet" href="{stylesheet}">
+</head>
+<body class="directory theme-{theme}">
+    <div class="bg-pattern"></div>
+
+    <a href="knowledge-base.html" class="back-button">← Back to Knowledge Base</a>
+
+    <div class="container">
+        <header class="header">
+            <h1>{heading}</h1>
+            <p>{intro}</p>
+        </header>
+
+        <div class="stats-bar">{stats}
+        </div>
+
+        <div class="search-filter">
+            <div class="search-box">
+                <span class="search-icon">🔍</span>
+                <input type="text" class="search-input" id="searchInput" placeholder="Search {noun}...">
+            </div>
+            <div class="filter-buttons">
+                <button class="filter-btn active" data-filter="all">All</button>{filters}
+            </div>
+        </div>
+
+        <div class="directory-grid" id="directory-grid">'''
+
+STAT = '''
+            <div class="stat">
+                <div class="stat-value">{value}</div>
+                <div class="stat-label">{label}</div>
+            </div>'''
+
+FILTER = '''
+                <button class="filter-btn" data-filter="{value}">{label}</button>'''
+
+CARD = '''
+            <div class="item-card" data-filter="{filter}" data-owner="{owner}">
+                <div class="item-header">
+                    <div class="{icon_class}">{icon}</div>
+                    <div class="item-title">{title}</div>{badge}
+                </div>
+                <div class="item-description">{description}</div>
+                <div class="item-footer">{tags}
+                    <span class="expand-hint">Click for details ▼</span>
+                </div>
+                <div class="item-details">{details}
+                </div>
+            </div>
+'''
+
+DETAIL = '''
+                    <div class="detail-row"><span class="detail-label">{label}:</span><span class="detail-value">{value}</span></div>'''
+
+PAGE_FOOT = '''        </div>
+
+        <div class="no-results" id="noResults" style="display: none;">
+            <h3>No {noun} found</h3>
+            <p>Try adjusting your search or filter</p>
+        </div>
+
+        <footer class="footer">
+            <p>{source_note}</p>
+            <p style="margin-top: 10px;">Created by <strong>Mor Haliva</strong> | ROC Team © 2025</p>
+        </footer>
+    </div>
+{scripts}
+</body>
+</html>
+'''
+
+# Shared files the pages link when they are not served from the bundle
+STYLESHEET = 'site.css'
+SCRIPTS = ['search-index.js', 'directory.js']
+
+ALERT_CATEGORIES = [
+    # (category, filter label, stat label or None)
+    ('revenue', 'Revenue', 'Revenue Alerts'),
+    ('spend', 'Spend', 'Spend Alerts'),
+    ('region', 'Regional', 'Regional Alerts'),
+    ('country', 'Country', None),
+    ('special', 'Special', None),
+]
+
+def alert_card(alert):
+    """roc_alerts.json record -> card fields"""
+    return {
+        'title': alert['title'],
+        'icon': alert.get('icon', '🚨'),
+        'icon_class': alert['category'],
+        'badge': alert.get('type'),
+        'description': alert.get('description', ''),
+        'tags': alert.get('tags', []),
+        'details': list(alert.get('details', {}).items()),
+        'filter': alert['category'],
+        'owner': ''
+    }
+
+def alert_stats(alerts):
+    stats = [(len(alerts), 'Total Alerts')]
+    for category, _, label in ALERT_CATEGORIES:
+        if label:
+            stats.append((sum(1 for alert in alerts if alert['category'] == category), label))
+    return stats
+
+def alert_filters(alerts):
+    return [(category, label) for category, label, _ in ALERT_CATEGORIES]
+
+def job_card(job):
+    """roc_kiwi_jobs.json record -> card fields"""
+    details = [('Creator', job['creator']), ('Description', job.get('description', '')),
+               ('Schedule', job.get('schedule', '')), ('Last Run', job.get('last_run', '')),
+               ('Status', job.get('status', ''))]
+    if job.get('category'):
+        details.append(('Category', job['category']))
+    return {
+        'title': job['name'],
+        'icon': '🥝',
+        'icon_class': '',
+        'badge': None,
+        'description': job.get('description', ''),
+        'tags': [job['creator']] + ([job['category']] if job.get('category') else []),
+        'details': details,
+        'link': (job['url'], 'View in Kiwi →') if job.get('url') else None,
+        'filter': job['creator'],
+        'owner': job['creator']
+    }
+
+def job_creators(jobs):
+    """Creators in order of first appearance"""
+    return list(dict.fromkeys(job['creator'] for job in jobs))
+
+def job_stats(jobs):
+    return [(len(jobs), 'Total Jobs')] + [
+        (sum(1 for job in jobs if job['creator'] == creator), creator) for creator in job_creators(jobs)]
+
+def job_filters(jobs):
+    return [(creator, creator) for creator in job_creators(jobs)]
+
+PAGES = {
+    'alerts': {
+        'source': 'roc_alerts.json',
+        'output': 'roc-alerts.html',
+        'title': 'ROC Alerts Directory',
+        'heading': '🚨 ROC Alerts Directory',
+        'intro': 'All ROC monitoring alerts from Raven - Click any alert for more details',
+        'noun': 'alerts',
+        'theme': 'alerts',
+        'source_note': 'Data sourced from Raven Alerts System',
+        'card': alert_card,
+        'stats': alert_stats,
+        'filters': alert_filters
+    },
+    'jobs': {
+        'source': 'roc_kiwi_jobs.json',
+        'output': 'roc-kiwi-jobs.html',
+        'title': 'ROC Kiwi Jobs Directory',
+        'heading': '🥝 ROC Kiwi Jobs Directory',
+        'intro': 'All ROC-related jobs from Kiwi platform - Click any job for more details',
+        'noun': 'jobs',
+        'theme': 'jobs',
+        'source_note': 'Data sourced from Kiwi Platform',
+        'card': job_card,
+        'stats': job_stats,
+        'filters': job_filters
+    },
+}
+
+def generate_card(card):
+    badge = ''
+    if card['badge']:
+        badge = (f'\n                    <span class="item-badge {escape(card["badge"].lower().replace(" ", "-"))}">'
+                 f'{escape(card["badge"])}</span>')
+    tags = ''.join(f'\n                    <span class="item-tag">{escape(tag)}</span>' for tag in card['tags'])
+    if card.get('link'):
+        url, label = card['link']
+        tags += f'\n                    <a href="{escape(url)}" target="_blank" class="item-tag item-link">{escape(label)}</a>'
+    details = ''.join(DETAIL.format(label=escape(label), value=escape(str(value))) for label, value in card['details'])
+    return CARD.format(
+        filter=escape(card['filter']),
+        owner=escape(card['owner']),
+        icon_class=escape(f"item-icon {card['icon_class']}".strip()),
+        icon=escape(card['icon']),
+        title=escape(card['title']),
+        badge=badge,
+        description=escape(card['description']),
+        tags=tags,
+        details=details
+    )
+
+def render_page(name, records, bundle=None):
+    """Whole page for PAGES[name] as a string
+
+    bundle: {'css': url, 'js': url} of build_site.py's shared bundle, or None to link the shared
+    files by name.
+    """
+    page = PAGES[name]
+    if bundle:
+        stylesheet = bundle['css']
+        scripts = [bundle['js']]
+    else:
+        stylesheet = STYLESHEET
+        scripts = SCRIPTS
+    text = {key: escape(page[key]) for key in ('title', 'heading', 'intro', 'noun', 'theme', 'source_note')}
+
+    parts = [PAGE_HEAD.format(
+        stylesheet=escape(stylesheet),
+        stats=''.join(STAT.format(value=value, label=escape(label)) for value, label in page['stats'](records)),
+        filters=''.join(FILTER.format(value=escape(value), label=escape(label))
+                        for value, label in page['filters'](records)),
+        **text
+    )]
+    parts.extend(generate_card(page['card'](record)) for record in records)
+    parts.append(PAGE_FOOT.format(
+        scripts=''.join(f'\n    <script src="{escape(url)}"></script>' for url in scripts),
+        noun=text['noun'],
+        source_note=text['source_note']
+    ))
+    return ''.join(parts)
+
+def load_records(name, path=None):
+    with open(path or PAGES[name]['source'], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the alerts and Kiwi jobs directory pages from their JSON")
+    parser.add_argument('pages', nargs='*', metavar='PAGE',
+                        help=f"Pages to generate: {', '.join(sorted(PAGES))} (default: all)")
+    parser.add_argument('--output-dir', default='.', help="Directory to write the pages to (default: .)")
+    args = parser.parse_args()
+    # choices= rejects an empty list on older Pythons
+    for name in args.pages:
+        if name not in PAGES:
+            parser.error(f"unknown page {name!r} (choose from {', '.join(sorted(PAGES))})")
+
+    for name in args.pages or PAGES:
+        page = PAGES[name]
+        records = load_records(name)
+        output = os.path.join(args.output_dir, page['output'])
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(render_page(name, records))
+        print(f"✅ {output}: {len(records)} {page['noun']} from {page['source']}")
+
+if __name__ == '__main__':
+    main()
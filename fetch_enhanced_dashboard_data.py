@@ -2,171 +2,104 @@
 """
 Fetch enhanced Tableau dashboard data with descriptions, tags, views, and data sources
 """
-import requests
+import argparse
+import os
 import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
-# Load credentials
-with open('mcp.json', 'r') as f:
-    config = json.load(f)
-    tableau = config['mcpServers']['tableau']['env']
-
-SERVER = tableau['SERVER']
-SITE_NAME = tableau['SITE_NAME']
-PAT_NAME = tableau['PAT_NAME']
-PAT_VALUE = tableau['PAT_VALUE']
-API_VERSION = "3.19"
-
-def sign_in():
-    url = f"{SERVER}/api/{API_VERSION}/auth/signin"
-    payload = {
-        "credentials": {
-            "personalAccessTokenName": PAT_NAME,
-            "personalAccessTokenSecret": PAT_VALUE,
-            "site": {"contentUrl": SITE_NAME}
-        }
-    }
-    response = requests.post(url, json=payload, headers={"Content-Type": "application/json", "Accept": "application/json"})
-    response.raise_for_status()
-    data = response.json()
-    return data['credentials']['token'], data['credentials']['site']['id']
-
-def get_workbooks_by_project_name(auth_token, site_id, project_name):
-    """Get all workbooks in a specific project by name"""
-    all_workbooks = []
-    page_number = 1
-    page_size = 100
+import tableau_metadata
+from catalog_rules import DEFAULT_RULES_PATH, load_rules
+from description_rules import DEFAULT_DESCRIPTION_RULES_PATH, describe_records, load_description_rules
+from fetch_metrics import RequestMetrics
+from http_cache import DEFAULT_CACHE_PATH, ResponseCache
+from tableau_client import TableauClient
+from thumbnails import DEFAULT_THUMBNAIL_DIR, DEFAULT_THUMBNAIL_WIDTH, add_thumbnails
+from view_history import DEFAULT_HISTORY_DIR, record_history
+
+# Number of workbooks enriched at the same time (views + data sources calls)
+DEFAULT_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', '8'))
+# Extra pages of a single workbook's views/connections fetched at the same time
+PAGE_CONCURRENCY = 4
+
+# Portal sections, in page order - which workbooks belong to each is set in catalog_rules.json
+CATALOG_CATEGORIES = ['production', 'playground']
+
+def get_workbooks_by_project_names(client, site_id, project_names, filter_expression,
+                                   max_workers=DEFAULT_CONCURRENCY):
+    """Get all workbooks matching a server-side filter with one listing, grouped by project name"""
+    params = {"filter": filter_expression} if filter_expression else None
+    workbooks = client.get_all_pages(f"sites/{site_id}/workbooks", 'workbooks', 'workbook',
+                                     params=params, page_size=100, max_workers=max_workers)
     
-    while True:
-        url = f"{SERVER}/api/{API_VERSION}/sites/{site_id}/workbooks"
-        params = {
-            "filter": f"projectName:eq:{project_name}",
-            "pageSize": page_size,
-            "pageNumber": page_number
-        }
-        response = requests.get(url, headers={"X-Tableau-Auth": auth_token, "Accept": "application/json"}, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        workbooks = data.get('workbooks', {}).get('workbook', [])
-        if not workbooks:
-            break
-        
-        all_workbooks.extend(workbooks)
-        
-        pagination = data.get('pagination', {})
-        total_available = int(pagination.get('totalAvailable', 0))
-        if page_number * page_size >= total_available:
-            break
-        page_number += 1
+    by_project = {name: [] for name in project_names}
+    for wb in workbooks:
+        project_name = wb.get('project', {}).get('name')
+        if project_name in by_project:
+            by_project[project_name].append(wb)
+    return by_project
+
+def build_view_data(client, views):
+    """Turn raw REST view objects into view records, most viewed first"""
+    view_data = []
+    for view in views:
+        content_url = view.get('contentUrl', '')
+        if content_url:
+            clean_url = content_url.replace('/sheets/', '/')
+            # Get view count from usage statistics
+            usage = view.get('usage', {})
+            view_count = usage.get('totalViewCount', 0) if isinstance(usage, dict) else 0
+            
+            view_data.append({
+                'name': view.get('name', 'Unnamed'),
+                'id': view.get('id', ''),
+                'url': f"{client.server}/#/views/{clean_url}",
+                'viewCount': view_count
+            })
     
-    return all_workbooks
+    # Sort views by view count (most viewed first)
+    view_data.sort(key=lambda x: int(x.get('viewCount', 0) or 0), reverse=True)
+    
+    return view_data
 
-def get_all_views_for_workbook(auth_token, site_id, workbook_id):
-    """Get all views/sheets for a workbook with their URLs and view counts"""
-    try:
-        # Include usage statistics in the request
-        url = f"{SERVER}/api/{API_VERSION}/sites/{site_id}/workbooks/{workbook_id}/views"
-        params = {"includeUsageStatistics": "true"}
-        response = requests.get(url, headers={"X-Tableau-Auth": auth_token, "Accept": "application/json"}, params=params)
-        response.raise_for_status()
-        views = response.json().get('views', {}).get('view', [])
-        
-        view_data = []
-        for view in views:
-            content_url = view.get('contentUrl', '')
-            if content_url:
-                clean_url = content_url.replace('/sheets/', '/')
-                # Get view count from usage statistics
-                usage = view.get('usage', {})
-                view_count = usage.get('totalViewCount', 0) if isinstance(usage, dict) else 0
-                
-                view_data.append({
-                    'name': view.get('name', 'Unnamed'),
-                    'id': view.get('id', ''),
-                    'url': f"{SERVER}/#/views/{clean_url}",
-                    'viewCount': view_count
-                })
-        
-        # Sort views by view count (most viewed first)
-        view_data.sort(key=lambda x: int(x.get('viewCount', 0) or 0), reverse=True)
-        
-        return view_data
-    except Exception as e:
-        print(f"    ⚠️ Error getting views: {e}")
-        return []
+def get_all_views_for_workbook(client, site_id, workbook_id):
+    """Get all views/sheets for a workbook with their URLs and view counts
+    
+    Errors are raised once the client's retries are used up - an empty list would look like a
+    workbook without views and silently drop it from the output.
+    """
+    # Include usage statistics in the request
+    params = {"includeUsageStatistics": "true"}
+    # Wide workbooks span several pages; extra pages are fetched concurrently
+    views = client.get_all_pages(f"sites/{site_id}/workbooks/{workbook_id}/views", 'views', 'view',
+                                 params=params, page_size=100, max_workers=PAGE_CONCURRENCY)
+    
+    return build_view_data(client, views)
 
-def generate_description(name, project, data_sources):
-    """Generate a one-sentence description based on workbook name and context"""
-    name_lower = name.lower()
+def get_site_views_by_workbook(client, site_id, max_workers=DEFAULT_CONCURRENCY, filter_expression=None):
+    """Page through every view on the site once (with usage) and group them by workbook id"""
+    params = {"includeUsageStatistics": "true"}
+    if filter_expression:
+        params["filter"] = filter_expression
+    views = client.get_all_pages(f"sites/{site_id}/views", 'views', 'view',
+                                 params=params, page_size=1000, max_workers=max_workers)
     
-    # Keywords for different types of dashboards
-    if 'hourly' in name_lower:
-        return f"Monitors hourly trends and real-time performance metrics."
-    elif 'daily' in name_lower:
-        return f"Tracks daily metrics and day-over-day performance changes."
-    elif 'alert' in name_lower:
-        return f"Automated alerting dashboard for proactive issue detection."
-    elif 'investigation' in name_lower or 'analysis' in name_lower:
-        return f"Deep-dive analysis tool for investigating performance patterns."
-    elif 'historical' in name_lower or 'seasonality' in name_lower:
-        return f"Historical trend analysis for understanding seasonal patterns and YoY changes."
-    elif 'revenue' in name_lower:
-        return f"Revenue tracking and financial performance monitoring."
-    elif 'triage' in name_lower:
-        return f"Triage dashboard for prioritizing and managing operational issues."
-    elif 'margin' in name_lower:
-        return f"Margin analysis for profitability and cost optimization insights."
-    elif 'health' in name_lower or 'status' in name_lower:
-        return f"Health status overview for quick operational assessment."
-    elif 'jira' in name_lower or 'roadmap' in name_lower:
-        return f"Project tracking dashboard for Jira tickets and roadmap progress."
-    elif 'constraint' in name_lower:
-        return f"Market constraints monitoring and capacity management."
-    elif 'user data' in name_lower:
-        return f"User data metrics and audience insights dashboard."
-    elif 'spend' in name_lower:
-        return f"Spend tracking and budget utilization analysis."
-    elif 'full data' in name_lower:
-        return f"Comprehensive data exploration with flexible filtering options."
-    elif 'trend' in name_lower:
-        return f"Trend analysis dashboard for tracking performance over time."
-    elif 'test' in name_lower or 'playground' in name_lower:
-        return f"Development/test version for feature experimentation."
-    elif 'publisher' in name_lower:
-        return f"Publisher-focused performance metrics and analytics."
-    elif 'advertiser' in name_lower:
-        return f"Advertiser performance tracking and campaign analytics."
-    elif 'roi' in name_lower:
-        return f"ROI tracking and return on investment analysis."
-    elif 'loss' in name_lower:
-        return f"Revenue loss tracking and recovery opportunity identification."
-    elif 'cpa' in name_lower or 'cvr' in name_lower:
-        return f"CPA/CVR analysis for conversion optimization insights."
-    elif 'proactive' in name_lower:
-        return f"Proactive monitoring dashboard for early issue detection."
-    elif 'supply' in name_lower:
-        return f"Supply-side metrics and inventory management dashboard."
-    elif 'readiness' in name_lower:
-        return f"Readiness assessment and migration tracking dashboard."
-    else:
-        # Generic description based on project
-        if project == 'ROC Protocol':
-            return f"ROC Protocol operational dashboard for real-time monitoring."
-        elif project == 'Triage':
-            return f"Triage tool for operational analysis and decision support."
-        elif project == 'ROC':
-            return f"ROC team dashboard for business intelligence and reporting."
-        else:
-            return f"Analytics dashboard for {project} insights and monitoring."
+    raw_views = {}
+    for view in views:
+        workbook_id = view.get('workbook', {}).get('id')
+        if workbook_id:
+            raw_views.setdefault(workbook_id, []).append(view)
+    
+    return {workbook_id: build_view_data(client, views) for workbook_id, views in raw_views.items()}
 
-def get_data_sources_for_workbook(auth_token, site_id, workbook_id):
+def get_data_sources_for_workbook(client, site_id, workbook_id):
     """Get data source information for a workbook with datasource names"""
     try:
-        url = f"{SERVER}/api/{API_VERSION}/sites/{site_id}/workbooks/{workbook_id}/connections"
-        response = requests.get(url, headers={"X-Tableau-Auth": auth_token, "Accept": "application/json"})
-        response.raise_for_status()
-        connections = response.json().get('connections', {}).get('connection', [])
+        connections = client.get_all_pages(f"sites/{site_id}/workbooks/{workbook_id}/connections",
+                                           'connections', 'connection',
+                                           page_size=100, max_workers=PAGE_CONCURRENCY)
         
         data_sources = []
         seen = set()
@@ -198,23 +131,10 @@ def get_data_sources_for_workbook(auth_token, site_id, workbook_id):
         print(f"    ⚠️ Error getting data sources: {e}")
         return []
 
-def enhance_workbook_data(auth_token, site_id, wb, category):
-    """Enhance workbook with views, data sources, tags, etc."""
-    workbook_id = wb.get('id')
+def build_workbook_record(wb, views, data_sources, category):
+    """Build the enhanced record for a workbook from its views and data sources"""
     name = wb.get('name', 'Unnamed')
     
-    print(f"  📊 {name}")
-    
-    # Get all views
-    print(f"    Getting views...")
-    views = get_all_views_for_workbook(auth_token, site_id, workbook_id)
-    print(f"    ✓ Found {len(views)} views")
-    
-    # Get data sources
-    print(f"    Getting data sources...")
-    data_sources = get_data_sources_for_workbook(auth_token, site_id, workbook_id)
-    print(f"    ✓ Found {len(data_sources)} data sources")
-    
     # Extract tags
     tags_obj = wb.get('tags', {})
     tags = []
@@ -227,19 +147,17 @@ def enhance_workbook_data(auth_token, site_id, wb, category):
     
     project_name = wb.get('project', {}).get('name', 'Unknown')
     
-    # Use existing description or generate one
-    existing_desc = wb.get('description', '').strip()
-    if existing_desc:
-        description = existing_desc
-    else:
-        description = generate_description(name, project_name, data_sources)
+    # Use existing description - describe_records() generates the missing ones in one batch
+    description = wb.get('description', '').strip()
     
     # Calculate total views across all sheets
     total_views = sum(int(v.get('viewCount', 0) or 0) for v in views)
     
     enhanced = {
+        'id': wb.get('id'),
         'name': name,
         'description': description,
+        'description_rule': {'rule': 'author'} if description else None,
         'project': project_name,
         'owner': wb.get('owner', {}).get('name', 'Unknown'),
         'created': wb.get('createdAt', ''),
@@ -257,95 +175,469 @@ def enhance_workbook_data(auth_token, site_id, wb, category):
     
     return enhanced
 
-print("🔐 Authenticating...")
-auth_token, site_id = sign_in()
-print("✅ Authenticated!\n")
+def get_views(client, site_id, workbook_id, site_views=None):
+    """Views for a workbook - from the bulk site sweep when available, else per-workbook"""
+    if site_views is not None:
+        if workbook_id in site_views:
+            return site_views[workbook_id]
+        # Published after the sweep (or has no views) - ask for it directly rather than drop it
+        print(f"    ↪️  Workbook {workbook_id} not in the views sweep, fetching its views directly")
+    return get_all_views_for_workbook(client, site_id, workbook_id)
 
-# Production Projects - ROC Protocol, Triage, and ROC
-production_projects = ['ROC Protocol', 'Triage', 'ROC']
-
-print("=" * 80)
-print("🏭 FETCHING PRODUCTION DASHBOARDS")
-print("=" * 80)
+def enhance_workbook_data(client, site_id, wb, category, site_views=None):
+    """Enhance workbook with views, data sources, tags, etc."""
+    workbook_id = wb.get('id')
+    
+    # Get all views and data sources
+    views = get_views(client, site_id, workbook_id, site_views)
+    data_sources = get_data_sources_for_workbook(client, site_id, workbook_id)
+    
+    return build_workbook_record(wb, views, data_sources, category)
 
-production_workbooks = []
-for proj_name in production_projects:
-    print(f"\n📁 Fetching from '{proj_name}' project...")
-    workbooks = get_workbooks_by_project_name(auth_token, site_id, proj_name)
-    production_workbooks.extend(workbooks)
-    print(f"✓ Found {len(workbooks)} workbooks")
+def reuse_workbook_data(client, site_id, wb, category, previous, refresh_usage=False, site_views=None):
+    """Rebuild an unchanged workbook from its previous record, optionally refreshing view counts"""
+    views = previous.get('views', [])
+    if refresh_usage:
+        # Only the views call carries usage statistics - data sources stay as they were
+        try:
+            fresh_views = get_views(client, site_id, wb.get('id'), site_views)
+        except Exception as e:
+            print(f"    ⚠️ Could not refresh view counts of workbook {wb.get('id')}, keeping the previous ones: {e}")
+            fresh_views = None
+        if fresh_views:
+            views = fresh_views
+    
+    return build_workbook_record(wb, views, previous.get('data_sources', []), category)
 
-print(f"\n✅ Total: {len(production_workbooks)} production workbooks\n")
+def load_previous_snapshot(path):
+    """Load a previous enhanced JSON file as {workbook id: record}"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    
+    previous = {}
+    for category in ('production', 'playground'):
+        for record in data.get(category, []):
+            # Records written before ids were stored can't be matched and get re-enriched
+            if record.get('id'):
+                previous[record['id']] = record
+    return previous
 
-production_data = []
-for wb in production_workbooks:
-    enhanced = enhance_workbook_data(auth_token, site_id, wb, 'production')
-    if enhanced['url']:  # Only add if it has at least one view
-        production_data.append(enhanced)
-    print()
+def is_unchanged(wb, previous_record):
+    return previous_record is not None and previous_record.get('updated') == wb.get('updatedAt', '')
 
-print(f"✅ Successfully processed {len(production_data)} production workbooks\n")
+def enhance_workbooks(client, site_id, workbooks, category, max_workers=DEFAULT_CONCURRENCY,
+                      previous=None, refresh_usage=False, site_views=None, prefetched=None, failed=None):
+    """Enhance many workbooks concurrently, yielding each record as soon as it completes
+    
+    With a previous snapshot, workbooks whose updatedAt did not change are carried over
+    instead of re-fetching their views and data sources. With site_views (from the bulk
+    sweep), views are joined locally instead of one views call per workbook. prefetched
+    ({workbook id: (views, data_sources)}, from the Metadata API) skips the calls entirely.
+    Completion order is arbitrary - compact_checkpoint() restores the listing order.
+    Workbooks whose calls still fail after the client's retries are not yielded; their ids
+    are appended to failed (when given) so the run can report them.
+    """
+    previous = previous or {}
+    max_workers = max(1, max_workers)
+    
+    def enhance(wb):
+        try:
+            return enhance_one(wb)
+        except Exception as e:
+            print(f"  ⚠️ Failed to enrich workbook {wb.get('id')} ({wb.get('name')}): {e}")
+            if failed is not None:
+                failed.append(wb.get('id'))
+            return None, False
+    
+    def enhance_one(wb):
+        if prefetched is not None:
+            views, data_sources = prefetched.get(wb.get('id'), ([], []))
+            return build_workbook_record(wb, views, data_sources, category), False
+        previous_record = previous.get(wb.get('id'))
+        if is_unchanged(wb, previous_record):
+            return reuse_workbook_data(client, site_id, wb, category, previous_record, refresh_usage,
+                                       site_views), True
+        return enhance_workbook_data(client, site_id, wb, category, site_views), False
+    
+    def report(future):
+        enhanced, was_reused = future.result()
+        if enhanced is None:
+            return enhanced, was_reused
+        if was_reused:
+            print(f"  ♻️  {enhanced['name']} (unchanged)")
+        else:
+            print(f"  📊 {enhanced['name']}")
+            print(f"    ✓ Found {len(enhanced['views'])} views, {len(enhanced['data_sources'])} data sources")
+        return enhanced, was_reused
+    
+    total = 0
+    reused = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Keep a bounded window of in-flight workbooks so memory stays flat on large sites
+        pending = set()
+        for wb in workbooks:
+            pending.add(executor.submit(enhance, wb))
+            if len(pending) >= max_workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    enhanced, was_reused = report(future)
+                    if enhanced is None:
+                        continue
+                    total += 1
+                    reused += was_reused
+                    yield enhanced
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                enhanced, was_reused = report(future)
+                if enhanced is None:
+                    continue
+                total += 1
+                reused += was_reused
+                yield enhanced
+    
+    if previous:
+        print(f"\n♻️  Reused {reused} unchanged, re-enriched {total - reused} new/updated workbooks")
 
-# Playground Projects - Guy, Mor, Yahel, Playground
-playground_projects = ['Playground', 'Mor', 'Guy', 'Yahel']
+def load_checkpoint_ids(path):
+    """Workbook ids already written to an NDJSON checkpoint (a torn last line is ignored)"""
+    done = set()
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)['id'])
+                except (ValueError, KeyError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return done
 
-print("=" * 80)
-print("🎮 FETCHING PLAYGROUND DASHBOARDS")
-print("=" * 80)
+def open_checkpoint(path, resume=False):
+    """Open the NDJSON checkpoint for writing - with resume, append after the last complete line
+    
+    A run killed mid-write leaves a torn last line; it is cut off first so the next record
+    doesn't get glued onto it (load_checkpoint_ids() already counts that workbook as missing).
+    """
+    if not resume:
+        return open(path, 'w')
+    checkpoint = open(path, 'ab+')
+    checkpoint.seek(0, os.SEEK_END)
+    end = checkpoint.tell()
+    position = end
+    while position > 0:
+        # Walk back a block at a time to the last newline
+        start = max(0, position - 4096)
+        checkpoint.seek(start)
+        newline = checkpoint.read(position - start).rfind(b'\n')
+        if newline != -1:
+            position = start + newline + 1
+            break
+        position = start
+    if position != end:
+        print(f"✂️  Dropping a torn {end - position}-byte line at the end of {path}")
+        checkpoint.truncate(position)
+    checkpoint.close()
+    return open(path, 'a')
 
-playground_workbooks = []
-for proj_name in playground_projects:
-    print(f"\n📁 Fetching from '{proj_name}' project...")
-    workbooks = get_workbooks_by_project_name(auth_token, site_id, proj_name)
-    playground_workbooks.extend(workbooks)
-    print(f"✓ Found {len(workbooks)} workbooks")
+def compact_checkpoint(path, workbooks_by_category):
+    """Turn the NDJSON checkpoint into the final {'production': [...], 'playground': [...]} lists
+    
+    Records are put back in listing order and then sorted by updated date, exactly like the
+    serial path. Workbooks no longer listed and workbooks without views are dropped.
+    """
+    positions = {}
+    for category, workbooks in workbooks_by_category.items():
+        for index, wb in enumerate(workbooks):
+            positions[(category, wb.get('id'))] = index
+    
+    records = {}
+    unreadable = 0
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                unreadable += 1
+                continue
+            key = (entry.get('category'), entry.get('id'))
+            if key in positions:
+                records[key] = entry['record']
+    if unreadable:
+        print(f"⚠️ Skipped {unreadable} unreadable lines in {path} - those workbooks are missing from the output")
+    
+    compacted = {}
+    for category in workbooks_by_category:
+        keys = sorted((key for key in records if key[0] == category), key=positions.get)
+        # Only add if it has at least one view
+        data = [records[key] for key in keys if records[key]['url']]
+        # Sort by updated date (most recent first)
+        data.sort(key=lambda x: x['updated'], reverse=True)
+        compacted[category] = data
+    return compacted
 
-print(f"\n✅ Total: {len(playground_workbooks)} playground workbooks\n")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch enhanced Tableau dashboard data")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Workbooks enriched in parallel (default: {DEFAULT_CONCURRENCY}, env FETCH_CONCURRENCY)")
+    parser.add_argument('--timeout', type=float, default=60,
+                        help="Per-request read timeout in seconds (default: 60)")
+    parser.add_argument('--max-retries', type=int, default=5,
+                        help="Retries for connection errors, 429s and 5xx responses (default: 5)")
+    parser.add_argument('--output', default='all_dashboards_data_enhanced.json',
+                        help="Where to write the enhanced JSON (default: all_dashboards_data_enhanced.json)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Only re-enrich workbooks that are new or whose updatedAt changed since --previous")
+    parser.add_argument('--previous', default=None,
+                        help="Snapshot used by --incremental (default: the --output file)")
+    parser.add_argument('--refresh-usage', action='store_true',
+                        help="With --incremental, still refresh view counts of unchanged workbooks")
+    parser.add_argument('--backend', choices=['rest', 'metadata'], default='rest',
+                        help="Catalog source: REST calls per workbook, or batched Metadata API (GraphQL) "
+                             "queries with view counts from one REST views sweep (default: rest)")
+    parser.add_argument('--bulk-views', action='store_true',
+                        help="Read views + usage with one site-wide sweep instead of one call per workbook")
+    parser.add_argument('--cache', action='store_true',
+                        help="Cache GET responses on disk (per-endpoint TTL, ETag/If-Modified-Since revalidation)")
+    parser.add_argument('--cache-only', action='store_true',
+                        help="Offline mode: answer everything from the cache, never touch the server")
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH,
+                        help=f"SQLite cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--cache-max-mb', type=int, default=200,
+                        help="Evict least recently used responses beyond this size (default: 200)")
+    parser.add_argument('--checkpoint', default=None,
+                        help="NDJSON file enriched workbooks are streamed to (default: <output>.checkpoint.ndjson)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip workbooks already in the checkpoint from an interrupted run")
+    parser.add_argument('--rules', default=DEFAULT_RULES_PATH,
+                        help="Inclusion rules: projects, owners and name patterns per category (default: catalog_rules.json)")
+    parser.add_argument('--description-rules', default=DEFAULT_DESCRIPTION_RULES_PATH,
+                        help="Rules for generated descriptions (default: description_rules.json)")
+    parser.add_argument('--thumbnails', action='store_true',
+                        help="Download a preview image of each dashboard's top view for the cards")
+    parser.add_argument('--thumbnail-dir', default=DEFAULT_THUMBNAIL_DIR,
+                        help=f"Where thumbnails and their manifest are kept (default: {DEFAULT_THUMBNAIL_DIR})")
+    parser.add_argument('--thumbnail-width', type=int, default=DEFAULT_THUMBNAIL_WIDTH,
+                        help=f"Downscale previews to this width in pixels (default: {DEFAULT_THUMBNAIL_WIDTH})")
+    parser.add_argument('--history-dir', default=DEFAULT_HISTORY_DIR,
+                        help=f"Append-only view-count history used for trends (default: {DEFAULT_HISTORY_DIR})")
+    parser.add_argument('--no-history', action='store_true',
+                        help="Don't record view counts or compute 7/30-day trends")
+    parser.add_argument('--metrics-dir', default='.',
+                        help="Where fetch_metrics.prom / fetch_metrics.json are written (default: current dir)")
+    args = parser.parse_args(argv)
+    if args.cache_only and args.backend == 'metadata':
+        parser.error("--cache-only works with the REST backend only (Metadata API queries are POSTs)")
+    return args
 
-playground_data = []
-for wb in playground_workbooks:
-    owner = wb.get('owner', {}).get('name', '')
+def main(argv=None):
+    args = parse_args(argv)
     
-    # Filter Guy's dashboards - only keep if "ROC" in title
-    if owner == 'guy.d':
-        if 'roc' not in wb.get('name', '').lower():
-            print(f"  ⏭️  Skipping: {wb.get('name')} (Guy's non-ROC)")
-            continue
+    cache = None
+    if args.cache or args.cache_only:
+        cache = ResponseCache(args.cache_path, max_bytes=args.cache_max_mb * 1024 * 1024)
+        print(f"💾 Using response cache: {args.cache_path}{' (offline)' if args.cache_only else ''}")
+
+    metrics = RequestMetrics()
+    client = TableauClient.from_credentials(timeout=(10, args.timeout), max_retries=args.max_retries,
+                                            pool_size=max(args.concurrency, 1) * 2,
+                                            cache=cache, cache_only=args.cache_only, metrics=metrics)
+    started = time.time()
+    success = False
+    failed = None
+    try:
+        failed = run_fetch(args, client)
+        success = not failed
+    finally:
+        metrics.set_run_info(success=int(success), duration_seconds=round(time.time() - started, 3),
+                             last_run_timestamp_seconds=int(time.time()))
+        print("\n" + "=" * 80)
+        print("📈 REQUEST METRICS")
+        print("=" * 80)
+        print(metrics.summary_table())
+        for path in metrics.write(args.metrics_dir):
+            print(f"💾 Metrics saved to: {path}")
+    if failed:
+        sys.exit(1)
+
+def run_fetch(args, client):
+    """Authenticate, enrich every configured project and write the enhanced JSON
     
-    enhanced = enhance_workbook_data(auth_token, site_id, wb, 'playground')
-    if enhanced['url']:  # Only add if it has at least one view
-        playground_data.append(enhanced)
+    Returns the ids of the workbooks that could not be enriched (missing from the output).
+    """
+    print("🔐 Authenticating...")
+    _, site_id = client.sign_in()
+    print("✅ Authenticated!\n")
+
+    previous = {}
+    if args.incremental:
+        previous = load_previous_snapshot(args.previous or args.output)
+        print(f"♻️  Incremental mode: {len(previous)} workbooks in previous snapshot\n")
+
+    rules = load_rules(args.rules)
+    site_views = None
+    if args.bulk_views or args.backend == 'metadata':
+        print("👁  Sweeping all site views with usage statistics...")
+        try:
+            # Views carry their own owner, so only the workbook project is pushed down here
+            site_views = get_site_views_by_workbook(client, site_id, args.concurrency,
+                                                    rules.rest_filter(CATALOG_CATEGORIES, fields=('projectName',)))
+            print(f"✅ Got views for {len(site_views)} workbooks\n")
+        except Exception as e:
+            if args.backend == 'metadata':
+                print(f"⚠️ Bulk views sweep failed ({e}), view counts will be missing\n")
+            else:
+                # Fall back to the per-workbook views calls
+                print(f"⚠️ Bulk views sweep failed ({e}), falling back to per-workbook views\n")
+
+    production_projects = rules['production'].projects
+    playground_projects = rules['playground'].projects
+
+    # One listing filtered server-side for every category, split back into buckets below
+    print("📁 Fetching workbooks from all projects...")
+    prefetched = None
+    if args.backend == 'metadata':
+        workbooks_by_project, prefetched = tableau_metadata.get_workbooks_by_project_names(
+            client, rules.project_names(CATALOG_CATEGORIES), site_views)
+    else:
+        workbooks_by_project = get_workbooks_by_project_names(client, site_id, rules.project_names(CATALOG_CATEGORIES),
+                                                              rules.rest_filter(CATALOG_CATEGORIES), args.concurrency)
+    print(f"✅ Found {sum(len(wbs) for wbs in workbooks_by_project.values())} workbooks\n")
+
+    # Every enriched workbook is appended here as it completes, so a crash loses nothing
+    checkpoint_path = args.checkpoint or f"{args.output}.checkpoint.ndjson"
+    done = load_checkpoint_ids(checkpoint_path) if args.resume else set()
+    if args.resume:
+        print(f"⏯️  Resuming: {len(done)} workbooks already in {checkpoint_path}\n")
+    checkpoint = open_checkpoint(checkpoint_path, args.resume)
+    failed = []
+
+    def select(workbooks, category):
+        """Apply the client-side rules before any per-workbook call is made"""
+        selected = []
+        for wb in workbooks:
+            reason = rules[category].exclusion_reason(wb)
+            if reason:
+                print(f"  ⏭️  Skipping: {wb.get('name')} ({reason})")
+                continue
+            selected.append(wb)
+        return selected
+
+    def enrich(workbooks, category):
+        """Stream enriched records to the checkpoint; returns (enriched now, resumed)"""
+        todo = [wb for wb in workbooks if wb.get('id') not in done]
+        enriched = 0
+        for enhanced in enhance_workbooks(client, site_id, todo, category, args.concurrency,
+                                          previous, args.refresh_usage, site_views, prefetched, failed):
+            checkpoint.write(json.dumps({'id': enhanced['id'], 'category': category, 'record': enhanced}) + '\n')
+            checkpoint.flush()
+            enriched += 1
+        return enriched, len(workbooks) - len(todo)
+
+    print("=" * 80)
+    print("🏭 FETCHING PRODUCTION DASHBOARDS")
+    print("=" * 80)
+
+    production_workbooks = []
+    for proj_name in production_projects:
+        workbooks = workbooks_by_project[proj_name]
+        production_workbooks.extend(workbooks)
+        print(f"📁 '{proj_name}': {len(workbooks)} workbooks")
+
+    print(f"\n✅ Total: {len(production_workbooks)} production workbooks\n")
+
+    selected_production = select(production_workbooks, 'production')
+    enriched, resumed = enrich(selected_production, 'production')
     print()
 
-print(f"✅ Successfully processed {len(playground_data)} playground workbooks\n")
-
-# Sort by updated date (most recent first)
-production_data.sort(key=lambda x: x['updated'], reverse=True)
-playground_data.sort(key=lambda x: x['updated'], reverse=True)
-
-# Save enhanced data
-all_dashboards = {
-    'production': production_data,
-    'playground': playground_data,
-    'last_updated': datetime.now().isoformat()
-}
-
-with open('all_dashboards_data_enhanced.json', 'w') as f:
-    json.dump(all_dashboards, f, indent=2)
-
-print("=" * 80)
-print("✅ SUMMARY")
-print("=" * 80)
-print(f"🏭 Production Dashboards: {len(production_data)}")
-print(f"🎮 Playground Dashboards: {len(playground_data)}")
-print(f"📊 Total: {len(production_data) + len(playground_data)}")
-print(f"\n💾 Data saved to: all_dashboards_data_enhanced.json")
-print(f"📅 Last updated: {all_dashboards['last_updated']}")
-print("\n✨ Enhanced data includes:")
-print("   ✓ Descriptions")
-print("   ✓ Tags")
-print("   ✓ All views/sheets")
-print("   ✓ Data sources")
-print("   ✓ Created dates")
-print("   ✓ Sheet counts")
+    print(f"✅ Successfully processed {enriched} production workbooks ({resumed} from checkpoint)\n")
+
+    print("=" * 80)
+    print("🎮 FETCHING PLAYGROUND DASHBOARDS")
+    print("=" * 80)
+
+    playground_workbooks = []
+    for proj_name in playground_projects:
+        workbooks = workbooks_by_project[proj_name]
+        playground_workbooks.extend(workbooks)
+        print(f"📁 '{proj_name}': {len(workbooks)} workbooks")
+
+    print(f"\n✅ Total: {len(playground_workbooks)} playground workbooks\n")
+
+    selected_playground = select(playground_workbooks, 'playground')
+    enriched, resumed = enrich(selected_playground, 'playground')
+    print()
+
+    print(f"✅ Successfully processed {enriched} playground workbooks ({resumed} from checkpoint)\n")
+    checkpoint.close()
+
+    if previous:
+        # Workbooks deleted on the server simply don't appear in the listings anymore
+        current_ids = {wb.get('id') for wb in production_workbooks + playground_workbooks}
+        pruned = len(set(previous) - current_ids)
+        print(f"🗑️  Pruned {pruned} workbooks no longer on the server\n")
+
+    # Compact the checkpoint into the usual layout (listing order, then most recently updated first)
+    compacted = compact_checkpoint(checkpoint_path, {'production': selected_production,
+                                                     'playground': selected_playground})
+    production_data = compacted['production']
+    playground_data = compacted['playground']
+
+    generated = describe_records(production_data + playground_data, load_description_rules(args.description_rules))
+    print(f"📝 Generated {generated} descriptions\n")
+
+    if not args.no_history:
+        added = record_history(production_data + playground_data, args.history_dir)
+        if added is None:
+            print("⚠️ NumPy not installed - skipping view history and trends\n")
+        else:
+            print(f"📈 View history: {added} changed view counts recorded, trends updated\n")
+
+    if args.thumbnails:
+        print("🖼️  Fetching view thumbnails...")
+        downloaded, reused, failed = add_thumbnails(client, site_id, production_data + playground_data,
+                                                    args.thumbnail_dir, args.thumbnail_width,
+                                                    max(1, args.concurrency // 2))
+        print(f"✅ Thumbnails: {downloaded} downloaded, {reused} unchanged, {failed} failed\n")
+
+    # Save enhanced data
+    all_dashboards = {
+        'production': production_data,
+        'playground': playground_data,
+        'last_updated': datetime.now().isoformat()
+    }
+
+    with open(args.output, 'w') as f:
+        json.dump(all_dashboards, f, indent=2)
+    os.remove(checkpoint_path)
+    client.metrics.set_run_info(dashboards_production=len(production_data),
+                                dashboards_playground=len(playground_data),
+                                workbooks_failed=len(failed))
+
+    print("=" * 80)
+    print("✅ SUMMARY")
+    print("=" * 80)
+    print(f"🏭 Production Dashboards: {len(production_data)}")
+    print(f"🎮 Playground Dashboards: {len(playground_data)}")
+    print(f"📊 Total: {len(production_data) + len(playground_data)}")
+    print(f"\n💾 Data saved to: {args.output}")
+    print(f"📅 Last updated: {all_dashboards['last_updated']}")
+    print("\n✨ Enhanced data includes:")
+    print("   ✓ Descriptions")
+    print("   ✓ Tags")
+    print("   ✓ All views/sheets")
+    print("   ✓ Data sources")
+    print("   ✓ Created dates")
+    print("   ✓ Sheet counts")
+
+    if failed:
+        print(f"\n⚠️ {len(failed)} workbooks could not be enriched and are missing from the output:")
+        for workbook_id in failed:
+            print(f"   - {workbook_id}")
+    return failed
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint request metrics for the Tableau fetcher
+Summary table at the end of a run, plus Prometheus textfile and JSON exports
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+# Histogram buckets (seconds) for request latency
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+UUID_SEGMENT = re.compile(r'/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$)')
+API_PREFIX = re.compile(r'^/api/[\d.]+/')
+
+def endpoint_template(url):
+    """'/api/3.19/sites/<uuid>/workbooks/<uuid>/views' -> 'sites/{id}/workbooks/{id}/views'"""
+    path = UUID_SEGMENT.sub('/{id}', urlparse(url).path)
+    return API_PREFIX.sub('', path).lstrip('/')
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class EndpointStats:
+    def __init__(self):
+        self.statuses = defaultdict(int)
+        self.latencies = []
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache = defaultdict(int)
+
+    @property
+    def requests(self):
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self):
+        return sum(count for status, count in self.statuses.items() if not str(status).startswith(('2', '3')))
+
+class RequestMetrics:
+    """Thread-safe collector fed by TableauClient for every request it makes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(EndpointStats)
+        self.started = time.time()
+        self.run_info = {}
+
+    def record(self, method, url, status, seconds, bytes_received=0, retries=0, cache=None):
+        key = (method, endpoint_template(url))
+        with self.lock:
+            stats = self.endpoints[key]
+            stats.statuses[status] += 1
+            stats.latencies.append(seconds)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+            stats.bytes_received += bytes_received
+            stats.retries += retries
+            if cache:
+                stats.cache[cache] += 1
+
+    def set_run_info(self, **info):
+        self.run_info.update(info)
+
+    def summary_table(self):
+        """Per-endpoint table, slowest total time first"""
+        rows = sorted(self.endpoints.items(), key=lambda item: -sum(item[1].latencies))
+        lines = [
+            f"{'Endpoint':<48} {'Reqs':>6} {'Errors':>6} {'Retries':>7} {'Cache hit':>9} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'Total s':>8} {'KB':>9}",
+            "-" * 118
+        ]
+        for (method, endpoint), stats in rows:
+            lookups = sum(stats.cache.values())
+            hit_rate = f"{100 * stats.cache['hit'] / lookups:.0f}%" if lookups else '-'
+            lines.append(
+                f"{method + ' ' + endpoint:<48} {stats.requests:>6} {stats.errors:>6} {stats.retries:>7} "
+                f"{hit_rate:>9} {1000 * percentile(stats.latencies, 0.5):>8.0f} "
+                f"{1000 * percentile(stats.latencies, 0.95):>8.0f} {sum(stats.latencies):>8.2f} "
+                f"{stats.bytes_received / 1024:>9.1f}")
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            'run': self.run_info,
+            'endpoints': [
+                {
+                    'method': method,
+                    'endpoint': endpoint,
+                    'requests': stats.requests,
+                    'errors': stats.errors,
+                    'statuses': {str(status): count for status, count in stats.statuses.items()},
+                    'retries': stats.retries,
+                    'cache': dict(stats.cache),
+                    'bytes_received': stats.bytes_received,
+                    'latency_seconds': {
+                        'total': sum(stats.latencies),
+                        'p50': percentile(stats.latencies, 0.5),
+                        'p95': percentile(stats.latencies, 0.95),
+                        'max': max(stats.latencies, default=0.0)
+                    }
+                }
+                for (method, endpoint), stats in sorted(self.endpoints.items())
+            ]
+        }
+
+    def to_prometheus(self):
+        lines = [
+            "# HELP roc_fetch_requests_total Tableau requests by endpoint and status.",
+            "# TYPE roc_fetch_requests_total counter",
+        ]
+        items = sorted(self.endpoints.items())
+        for (method, endpoint), stats in items:
+            for status, count in sorted(stats.statuses.items(), key=lambda item: str(item[0])):
+                lines.append(f'roc_fetch_requests_total{{method="{method}",endpoint="{escape_label(endpoint)}",'
+                             f'status="{status}"}} {count}')
+
+        lines += [
+            "# HELP roc_fetch_request_duration_seconds Tableau request latency, retries included.",
+            "# TYPE roc_fetch_request_duration_seconds histogram",
+        ]
+        for (method, endpoint), stats in items:
+            labels = f'method="{method}",endpoint="{escape_label(endpoint)}"'
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                lines.append(f'roc_fetch_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'roc_fetch_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.requests}')
+            lines.append(f'roc_fetch_request_duration_seconds_sum{{{labels}}} {sum(stats.latencies):.6f}')
+            lines.append(f'roc_fetch_request_duration_seconds_count{{{labels}}} {stats.requests}')
+
+        for name, help_text, attribute in (
+                ('roc_fetch_response_bytes_total', 'Response bytes received from Tableau.', 'bytes_received'),
+                ('roc_fetch_retries_total', 'Retried attempts (429, 5xx, connection errors).', 'retries')):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, endpoint), stats in items:
+                lines.append(f'{name}{{method="{method}",endpoint="{escape_label(endpoint)}"}} '
+                             f'{getattr(stats, attribute)}')
+
+        lines += [
+            "# HELP roc_fetch_cache_requests_total Response cache lookups by result.",
+            "# TYPE roc_fetch_cache_requests_total counter",
+        ]
+        for (method, endpoint), stats in items:
+            for result, count in sorted(stats.cache.items()):
+                lines.append(f'roc_fetch_cache_requests_total{{method="{method}",endpoint="{escape_label(endpoint)}",'
+                             f'result="{result}"}} {count}')
+
+        for name, value in sorted(self.run_info.items()):
+            lines += [f"# TYPE roc_fetch_{name} gauge", f"roc_fetch_{name} {value}"]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory, basename='fetch_metrics'):
+        """Write <basename>.prom (node_exporter textfile format) and <basename>.json"""
+        os.makedirs(directory, exist_ok=True)
+        for extension, content in (('prom', self.to_prometheus()), ('json', json.dumps(self.to_dict(), indent=2))):
+            path = os.path.join(directory, f"{basename}.{extension}")
+            # Atomic replace so the textfile collector never reads a half-written file
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return [os.path.join(directory, f"{basename}.{extension}") for extension in ('prom', 'json')]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Persistent (SQLite) cache of rendered HTML fragments for the page generators
+Fragments are keyed by a SHA-256 of the template version and the data they were rendered from,
+so unchanged records are spliced in as-is and anything else is re-rendered. Fragments no run
+has used for max_age seconds are dropped on save.
+"""
+import hashlib
+import pickle
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = '.fragment_cache.sqlite'
+DEFAULT_MAX_AGE = 7 * 86400
+# used_at is only rewritten when older than this, so a warm run is read-only
+TOUCH_AFTER = 86400
+# SQLite's default limit on ? parameters per statement
+LOOKUP_BATCH = 900
+
+class FragmentCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, version='', max_age=DEFAULT_MAX_AGE):
+        self.version = version
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.fresh = {}
+        self.loaded = {}
+        self.touch = set()
+
+        # Several generators may share the file - wait for each other's writes
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS fragments (
+                key TEXT PRIMARY KEY,
+                html TEXT,
+                used_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS fragments_used ON fragments (used_at);
+        """)
+        self.db.commit()
+
+    def key(self, *parts):
+        """Content hash of parts
+
+        Pickle is several times faster than a JSON dump here; equal bytes always mean equal data,
+        and records loaded from JSON the same way pickle the same way.
+        """
+        return hashlib.sha256(pickle.dumps((self.version, parts), protocol=4)).hexdigest()
+
+    def prefetch(self, keys):
+        """Load the cached fragments for many keys in a few queries"""
+        keys = [key for key in keys if key not in self.loaded and key not in self.fresh]
+        touch_before = time.time() - TOUCH_AFTER
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self.db.execute(f"SELECT key, html, used_at FROM fragments WHERE key IN ({placeholders})", batch)
+            for key, html, used_at in rows:
+                self.loaded[key] = html
+                if used_at < touch_before:
+                    self.touch.add(key)
+
+    def get(self, key, render):
+        """Cached fragment for a key from key(), calling render() on a miss"""
+        fragment = self.loaded.get(key) or self.fresh.get(key)
+        if fragment is None:
+            row = self.db.execute("SELECT html FROM fragments WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.hits += 1
+                self.loaded[key] = row[0]
+                self.touch.add(key)
+                return row[0]
+            fragment = render()
+            self.fresh[key] = fragment
+            self.misses += 1
+        else:
+            self.hits += 1
+        return fragment
+
+    def save(self):
+        """Store this run's new fragments, mark the reused ones and drop long-unused ones"""
+        now = time.time()
+        self.db.executemany("INSERT OR REPLACE INTO fragments VALUES (?, ?, ?)",
+                            [(key, html, now) for key, html in self.fresh.items()])
+        self.db.executemany("UPDATE fragments SET used_at = ? WHERE key = ?", [(now, key) for key in self.touch])
+        self.db.execute("DELETE FROM fragments WHERE used_at < ?", (now - self.max_age,))
+        self.db.commit()
+        self.fresh = {}
+        self.loaded = {}
+        self.touch = set()
+
+    def close(self):
+        self.db.close()
@@ -3,29 +3,29 @@
 Generate enhanced HTML with search, filters, and rich metadata
 Beautiful dark theme matching the Knowledge Base design
 """
+import argparse
+import hashlib
 import json
+import os
+import re
 from datetime import datetime
 
-# Load the enhanced data
-with open('all_dashboards_data_enhanced.json', 'r') as f:
-    data = json.load(f)
+from fragment_cache import DEFAULT_CACHE_PATH, FragmentCache
+from search_index import index_json
 
-production = data['production']
-playground = data['playground']
-last_updated = data.get('last_updated', datetime.now().isoformat())
+DEFAULT_INPUT = 'all_dashboards_data_enhanced.json'
+DEFAULT_OUTPUT = 'roc_dashboards_enhanced.html'
 
-# Sort dashboards by updated date (descending - most recent first)
-production = sorted(production, key=lambda x: x.get('updated', ''), reverse=True)
-playground = sorted(playground, key=lambda x: x.get('updated', ''), reverse=True)
+# Cached cards are rendered with this in place of their id, which depends on the card's position
+CARD_ID_SLOT = '\x00card-id\x00'
 
-# Format the date nicely
-try:
-    dt = datetime.fromisoformat(last_updated.replace('Z', '+00:00'))
-    formatted_date = dt.strftime('%B %d, %Y at %I:%M %p')
-except:
-    formatted_date = last_updated
+# Lazy panels: each card's sheet and data-source lists, next to the output HTML
+PANELS_DIR = 'panels'
+PANEL_FILE = re.compile(r'^[0-9a-f]{16}\.json$')
 
-html = f'''<!DOCTYPE html>
+# The page is a few fixed templates (filled with str.format, hence the doubled CSS braces)
+# around the cards, streamed to the output file chunk by chunk
+PAGE_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -34,34 +34,8 @@ html = f'''<!DOCTYPE html>
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <link href="https://fonts.googleapis.com/css2?family=DM+Sans:wght@400;500;600;700&family=JetBrains+Mono:wght@400;500&display=swap" rel="stylesheet">
+{shared_styles}
     <style>
-        :root {{
-            --bg-primary: #f8fafc;
-            --bg-secondary: #ffffff;
-            --bg-card: #ffffff;
-            --bg-card-hover: #f1f5f9;
-            --border: rgba(0, 0, 0, 0.08);
-            --border-hover: rgba(0, 0, 0, 0.15);
-            --text-primary: #1e293b;
-            --text-secondary: #64748b;
-            --text-muted: #94a3b8;
-            --accent-cyan: #0891b2;
-            --accent-purple: #7c3aed;
-            --accent-green: #059669;
-            --accent-orange: #d97706;
-            --accent-pink: #db2777;
-            --accent-blue: #2563eb;
-            --gradient-1: linear-gradient(135deg, #3b82f6 0%, #8b5cf6 100%);
-            --gradient-2: linear-gradient(135deg, #0891b2 0%, #7c3aed 100%);
-            --shadow-glow: 0 4px 20px rgba(0, 0, 0, 0.08);
-        }}
-
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
         body {{
             font-family: 'DM Sans', -apple-system, BlinkMacSystemFont, sans-serif;
             background: var(--bg-primary);
@@ -278,6 +252,18 @@ html = f'''<!DOCTYPE html>
             color: var(--bg-primary);
         }}
 
+        .sort-select {{
+            padding: 12px 16px;
+            background: var(--bg-secondary);
+            border: 2px solid var(--border);
+            border-radius: 10px;
+            color: var(--text-secondary);
+            font-family: 'DM Sans', sans-serif;
+            font-size: 0.95em;
+            font-weight: 600;
+            cursor: pointer;
+        }}
+
         /* Section Headers */
         .section {{
             margin-bottom: 50px;
@@ -351,6 +337,21 @@ html = f'''<!DOCTYPE html>
             box-shadow: 0 12px 30px rgba(8, 145, 178, 0.1);
         }}
 
+        /* Preview thumbnail - width/height attributes reserve the space before it loads */
+        .dashboard-thumbnail {{
+            display: block;
+            margin: -28px -28px 20px;
+            border-radius: 16px 16px 0 0;
+            overflow: hidden;
+            background: var(--bg-secondary);
+        }}
+
+        .dashboard-thumbnail img {{
+            display: block;
+            width: 100%;
+            height: auto;
+        }}
+
         .dashboard-name {{
             font-size: 1.3em;
             font-weight: 700;
@@ -396,6 +397,20 @@ html = f'''<!DOCTYPE html>
             font-weight: 600;
         }}
 
+        .meta-trend {{
+            color: var(--accent-green);
+            font-weight: 600;
+        }}
+
+        .stale-badge {{
+            background: rgba(148, 163, 184, 0.15);
+            color: var(--text-muted);
+            padding: 2px 10px;
+            border-radius: 8px;
+            font-size: 0.9em;
+            font-weight: 600;
+        }}
+
         /* Tags */
         .tags {{
             display: flex;
@@ -522,6 +537,12 @@ html = f'''<!DOCTYPE html>
             font-size: 0.9em;
         }}
 
+        .panel-status {{
+            padding: 6px 0;
+            font-size: 0.85em;
+            color: var(--text-secondary);
+        }}
+
         /* Dashboard Link Button */
         .dashboard-link {{
             display: inline-flex;
@@ -651,15 +672,15 @@ html = f'''<!DOCTYPE html>
 
         <div class="stats">
             <div class="stat-card production">
-                <div class="stat-number">{len(production)}</div>
+                <div class="stat-number">{production_count}</div>
                 <div class="stat-label">🏭 Production</div>
             </div>
             <div class="stat-card playground">
-                <div class="stat-number">{len(playground)}</div>
+                <div class="stat-number">{playground_count}</div>
                 <div class="stat-label">🎮 Playground</div>
             </div>
             <div class="stat-card total">
-                <div class="stat-number">{len(production) + len(playground)}</div>
+                <div class="stat-number">{total_count}</div>
                 <div class="stat-label">📈 Total</div>
             </div>
         </div>
@@ -673,6 +694,13 @@ html = f'''<!DOCTYPE html>
                 <button class="filter-btn active" data-filter="all">✨ All Dashboards</button>
                 <button class="filter-btn" data-filter="production">🏭 Production</button>
                 <button class="filter-btn" data-filter="playground">🎮 Playground</button>
+                <select id="sortSelect" class="sort-select" aria-label="Sort dashboards">
+                    <option value="updated">🔄 Recently updated</option>
+                    <option value="views">👁 Most viewed</option>
+                    <option value="views7">📈 Trending this week</option>
+                    <option value="views30">📈 Trending this month</option>
+                    <option value="stale">💤 Least used</option>
+                </select>
             </div>
         </div>
 
@@ -681,103 +709,12 @@ html = f'''<!DOCTYPE html>
                 <div class="section-title production">
                     <span>🏭</span> Production Dashboards
                 </div>
-                <div class="section-count production" id="production-count">{len(production)}</div>
+                <div class="section-count production" id="production-count">{production_count}</div>
             </div>
             <div class="dashboard-grid" id="production-grid">
 '''
 
-def generate_card(dashboard, category):
-    """Generate HTML for a single dashboard card"""
-    desc = dashboard['description'] if dashboard['description'] else 'No description available'
-    desc_class = '' if dashboard['description'] else 'empty'
-    
-    tags_html = ''
-    if dashboard['tags']:
-        tags_html = '<div class="tags">'
-        for tag in dashboard['tags']:
-            tags_html += f'<span class="tag">🏷️ {tag}</span>'
-        tags_html += '</div>'
-    
-    # Data Sources Section
-    data_sources_html = ''
-    if dashboard['data_sources']:
-        ds_count = len(dashboard['data_sources'])
-        ds_items = ''
-        for ds in dashboard['data_sources']:
-            ds_name = ds['name']
-            ds_type = ds.get('type', 'unknown').upper()
-            badge_class = 'vertica' if 'vertica' in ds_type.lower() else 'bigquery' if 'bigquery' in ds_type.lower() else 'other'
-            ds_items += f'<div class="data-source"><span class="ds-badge {badge_class}">{ds_type}</span>{ds_name}</div>'
-        
-        data_sources_html = f'''
-            <div class="collapsible-section">
-                <div class="collapsible-header" onclick="toggleSection(this)">
-                    <span class="collapsible-title">🗄️ Data Sources ({ds_count})</span>
-                    <span class="toggle-icon">▼</span>
-                </div>
-                <div class="collapsible-content">
-                    <div class="collapsible-inner">{ds_items}</div>
-                </div>
-            </div>'''
-    
-    # Views/Sheets Section
-    views_html = ''
-    if len(dashboard['views']) > 0:
-        view_count_total = len(dashboard['views'])
-        view_items = ''
-        for view in dashboard['views']:
-            view_count = int(view.get('viewCount', 0) or 0)
-            count_display = f' <span class="view-count">({view_count:,}👁)</span>' if view_count > 0 else ""
-            view_items += f'<a href="{view["url"]}" class="view-link" target="_blank">{view["name"]}{count_display}</a>'
-        
-        views_html = f'''
-            <div class="collapsible-section">
-                <div class="collapsible-header" onclick="toggleSection(this)">
-                    <span class="collapsible-title">📑 Sheets ({view_count_total})</span>
-                    <span class="toggle-icon">▼</span>
-                </div>
-                <div class="collapsible-content">
-                    <div class="collapsible-inner"><div class="view-links">{view_items}</div></div>
-                </div>
-            </div>'''
-    
-    created_date = datetime.fromisoformat(dashboard['created'].replace('Z', '+00:00')).strftime('%b %d, %Y')
-    updated_date = datetime.fromisoformat(dashboard['updated'].replace('Z', '+00:00')).strftime('%b %d, %Y')
-    total_views = int(dashboard.get('total_views', 0) or 0)
-    
-    return f'''
-            <div class="dashboard-card" data-category="{category}" 
-                 data-name="{dashboard['name'].lower()}"
-                 data-description="{desc.lower()}"
-                 data-tags="{' '.join(dashboard['tags']).lower()}"
-                 data-owner="{dashboard['owner'].lower()}"
-                 data-sources="{' '.join([ds['name'].lower() for ds in dashboard['data_sources']])}">
-                <div class="dashboard-name">{dashboard['name']}</div>
-                <div class="dashboard-description {desc_class}">{desc}</div>
-                {tags_html}
-                <div class="dashboard-meta">
-                    <div class="meta-item"><span class="icon">👤</span> {dashboard['owner']}</div>
-                    <div class="meta-item"><span class="icon">📁</span> {dashboard['project']}</div>
-                    <div class="meta-item"><span class="icon">📊</span> {dashboard['sheet_count']} sheets</div>
-                    <div class="meta-item"><span class="icon">👁</span> <span class="meta-highlight">{total_views:,}</span> views</div>
-                </div>
-                <div class="dashboard-meta">
-                    <div class="meta-item"><span class="icon">📅</span> Created: {created_date}</div>
-                    <div class="meta-item"><span class="icon">🔄</span> Updated: {updated_date}</div>
-                </div>
-                {data_sources_html}
-                {views_html}
-                <a href="{dashboard['url']}" class="dashboard-link" target="_blank">
-                    View Dashboard <span>→</span>
-                </a>
-            </div>
-'''
-
-# Generate production cards
-for dashboard in production:
-    html += generate_card(dashboard, 'production')
-
-html += f'''
+PLAYGROUND_HEAD = '''
             </div>
         </div>
 
@@ -786,16 +723,12 @@ html += f'''
                 <div class="section-title playground">
                     <span>🎮</span> Playground Dashboards
                 </div>
-                <div class="section-count playground" id="playground-count">{len(playground)}</div>
+                <div class="section-count playground" id="playground-count">{playground_count}</div>
             </div>
             <div class="dashboard-grid" id="playground-grid">
 '''
 
-# Generate playground cards
-for dashboard in playground:
-    html += generate_card(dashboard, 'playground')
-
-html += '''
+PAGE_FOOT = '''
             </div>
         </div>
 
@@ -810,14 +743,17 @@ html += '''
             </p>
         </footer>
     </div>
+'''
 
+STATIC_SCRIPT = '''
     <script>
-        // Toggle collapsible sections
+        // Toggle collapsible sections - lazy panels load their list on first open (panels.js)
         function toggleSection(header) {
             const content = header.nextElementSibling;
             const icon = header.querySelector('.toggle-icon');
             content.classList.toggle('open');
             icon.classList.toggle('open');
+            if (content.classList.contains('open')) fillPanel(header);
         }
 
         // Search functionality
@@ -829,24 +765,24 @@ html += '''
         const playgroundCount = document.getElementById('playground-count');
         const sections = document.querySelectorAll('.section');
 
+        // Matching runs in a Web Worker (search-worker.js) when the browser allows it
+        const searchClient = createSearchClient({ json: document.getElementById('search-index').textContent }, 'search-worker.js');
+
         let currentFilter = 'all';
+        // Card ids in relevance order from the last search, or null when the search box is empty
+        let ranked = null;
 
         function updateDisplay() {
-            const searchTerm = searchInput.value.toLowerCase();
+            const rank = ranked && new Map(ranked.map((id, position) => [id, position]));
             let visibleCount = 0;
             let productionVisible = 0;
             let playgroundVisible = 0;
 
+            arrangeCards(rank);
+
             dashboardCards.forEach((card, index) => {
                 const category = card.dataset.category;
-                const name = card.dataset.name;
-                const description = card.dataset.description;
-                const tags = card.dataset.tags;
-                const owner = card.dataset.owner;
-                const sources = card.dataset.sources;
-
-                const searchableText = `${name} ${description} ${tags} ${owner} ${sources}`;
-                const matchesSearch = searchableText.includes(searchTerm);
+                const matchesSearch = !rank || rank.has(Number(card.dataset.id));
                 const matchesFilter = currentFilter === 'all' || category === currentFilter;
 
                 if (matchesSearch && matchesFilter) {
@@ -880,7 +816,46 @@ html += '''
             noResults.style.display = visibleCount === 0 ? 'block' : 'none';
         }
 
-        searchInput.addEventListener('input', updateDisplay);
+        // Sorting - reorders the cards inside each grid, then reapplies search and filter
+        const sortSelect = document.getElementById('sortSelect');
+        const sortKeys = {
+            updated: card => card.dataset.updated,
+            views: card => Number(card.dataset.views),
+            views7: card => Number(card.dataset.views7 || 0),
+            views30: card => Number(card.dataset.views30 || 0),
+            stale: card => -Number(card.dataset.views30 || card.dataset.views)
+        };
+
+        // Search results in relevance order; otherwise the selected sort (stable, so ties keep page order)
+        function arrangeCards(rank) {
+            const key = sortKeys[sortSelect.value];
+            document.querySelectorAll('.dashboard-grid').forEach(grid => {
+                const cards = Array.from(grid.querySelectorAll('.dashboard-card'));
+                cards.sort((a, b) => {
+                    if (rank) {
+                        const ra = rank.has(Number(a.dataset.id)) ? rank.get(Number(a.dataset.id)) : Infinity;
+                        const rb = rank.has(Number(b.dataset.id)) ? rank.get(Number(b.dataset.id)) : Infinity;
+                        if (ra !== rb) return ra < rb ? -1 : 1;
+                    }
+                    const ka = key(a), kb = key(b);
+                    return ka < kb ? 1 : ka > kb ? -1 : Number(a.dataset.id) - Number(b.dataset.id);
+                });
+                cards.forEach(card => grid.appendChild(card));
+            });
+        }
+
+        sortSelect.addEventListener('change', updateDisplay);
+
+        let searchTimer = null;
+        searchInput.addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                searchClient.query(searchInput.value, ids => {
+                    ranked = ids;
+                    updateDisplay();
+                });
+            }, 80);
+        });
 
         filterButtons.forEach(button => {
             button.addEventListener('click', () => {
@@ -903,18 +878,438 @@ html += '''
 </html>
 '''
 
-# Write the HTML file
-with open('roc_dashboards_enhanced.html', 'w') as f:
-    f.write(html)
-
-print("✅ Enhanced HTML generated: roc_dashboards_enhanced.html")
-print(f"📊 Total dashboards: {len(production) + len(playground)}")
-print("✨ Features included:")
-print("   ✓ Beautiful dark theme matching Knowledge Base")
-print("   ✓ Animated background and card effects")
-print("   ✓ Search by name, description, tags, owner, data source")
-print("   ✓ Filter by category (Production/Playground)")
-print("   ✓ Collapsible data sources and sheets sections")
-print("   ✓ View counts for each sheet")
-print("   ✓ Keyboard shortcut (Cmd+K) for search")
-print("   ✓ Responsive design")
+# Both modes: the prebuilt inverted index (search_index.py), the worker that queries it and the
+# same query code on the page, which starts the worker and stands in for it where workers fail
+SEARCH_SCRIPT = '''
+    <script id="search-index" type="application/json">{index}</script>
+    <script id="search-worker" type="text/js-worker">
+{search}
+{worker}
+    </script>
+    <script>
+{search}
+    </script>'''
+
+# Both modes: loads the lazy sheet/data-source panels
+PANELS_SCRIPT = '''
+    <script>
+{panels}
+    </script>'''
+
+# Self-contained pages inline the shared theme (site.css); sites from build_site.py link its
+# bundle, which also carries search-index.js and panels.js
+SHARED_STYLE = '''    <style>
+{css}
+    </style>'''
+
+BUNDLE_STYLE = '''    <link rel="stylesheet" href="{url}">'''
+
+BUNDLE_SEARCH_SCRIPT = '''
+    <script id="search-index" type="application/json">{index}</script>
+    <script src="{url}"></script>'''
+
+# Virtual mode: the cards travel as JSON and virtual-grid.js renders only the visible rows
+VIRTUAL_SCRIPT = '''
+    <style>
+        .dashboard-grid {{ overflow-anchor: none; }}
+    </style>
+    <script id="catalog-data" type="application/json">{catalog}</script>
+    <script>
+{renderer}
+    </script>
+</body>
+</html>
+'''
+
+RENDERER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'virtual-grid.js')
+SEARCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search-index.js')
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search-worker.js')
+PANELS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'panels.js')
+SITE_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'site.css')
+
+def lazy_section(kind, title):
+    """Collapsible panel whose list panels.js fetches on first open"""
+    return f'''
+            <div class="collapsible-section" data-panel="{kind}">
+                <div class="collapsible-header" onclick="toggleSection(this)">
+                    <span class="collapsible-title">{title}</span>
+                    <span class="toggle-icon">▼</span>
+                </div>
+                <div class="collapsible-content">
+                    <div class="collapsible-inner"></div>
+                </div>
+            </div>'''
+
+def generate_card(dashboard, category, card_id, panels_url=None):
+    """Generate HTML for a single dashboard card
+
+    With panels_url the data-source and sheet lists are left out (only their counts remain)
+    and loaded from that shard when expanded.
+    """
+    desc = dashboard['description'] if dashboard['description'] else 'No description available'
+    desc_class = '' if dashboard['description'] else 'empty'
+    
+    tags_html = ''
+    if dashboard['tags']:
+        tags_html = '<div class="tags">' + ''.join(f'<span class="tag">🏷️ {tag}</span>' for tag in dashboard['tags']) + '</div>'
+    
+    # Data Sources Section
+    data_sources_html = ''
+    if dashboard['data_sources'] and panels_url:
+        data_sources_html = lazy_section('sources', f"🗄️ Data Sources ({len(dashboard['data_sources'])})")
+    elif dashboard['data_sources']:
+        ds_count = len(dashboard['data_sources'])
+        ds_parts = []
+        for ds in dashboard['data_sources']:
+            ds_name = ds['name']
+            ds_type = ds.get('type', 'unknown').upper()
+            badge_class = 'vertica' if 'vertica' in ds_type.lower() else 'bigquery' if 'bigquery' in ds_type.lower() else 'other'
+            ds_parts.append(f'<div class="data-source"><span class="ds-badge {badge_class}">{ds_type}</span>{ds_name}</div>')
+        ds_items = ''.join(ds_parts)
+        
+        data_sources_html = f'''
+            <div class="collapsible-section">
+                <div class="collapsible-header" onclick="toggleSection(this)">
+                    <span class="collapsible-title">🗄️ Data Sources ({ds_count})</span>
+                    <span class="toggle-icon">▼</span>
+                </div>
+                <div class="collapsible-content">
+                    <div class="collapsible-inner">{ds_items}</div>
+                </div>
+            </div>'''
+    
+    # Views/Sheets Section
+    views_html = ''
+    if dashboard['views'] and panels_url:
+        views_html = lazy_section('sheets', f"📑 Sheets ({len(dashboard['views'])})")
+    elif len(dashboard['views']) > 0:
+        view_count_total = len(dashboard['views'])
+        view_parts = []
+        for view in dashboard['views']:
+            view_count = int(view.get('viewCount', 0) or 0)
+            count_display = f' <span class="view-count">({view_count:,}👁)</span>' if view_count > 0 else ""
+            view_parts.append(f'<a href="{view["url"]}" class="view-link" target="_blank">{view["name"]}{count_display}</a>')
+        view_items = ''.join(view_parts)
+        
+        views_html = f'''
+            <div class="collapsible-section">
+                <div class="collapsible-header" onclick="toggleSection(this)">
+                    <span class="collapsible-title">📑 Sheets ({view_count_total})</span>
+                    <span class="toggle-icon">▼</span>
+                </div>
+                <div class="collapsible-content">
+                    <div class="collapsible-inner"><div class="view-links">{view_items}</div></div>
+                </div>
+            </div>'''
+    
+    # Preview image, lazy-loaded with explicit dimensions so off-screen cards cost nothing
+    thumbnail_html = ''
+    thumbnail = dashboard.get('thumbnail')
+    if thumbnail:
+        size_attrs = f' width="{thumbnail["width"]}" height="{thumbnail["height"]}"' if thumbnail.get('width') else ''
+        thumbnail_html = f'''<a href="{dashboard['url']}" class="dashboard-thumbnail" target="_blank" tabindex="-1"><img src="{thumbnail['src']}" alt=""{size_attrs} loading="lazy" decoding="async"></a>
+                '''
+    
+    created_date = datetime.fromisoformat(dashboard['created'].replace('Z', '+00:00')).strftime('%b %d, %Y')
+    updated_date = datetime.fromisoformat(dashboard['updated'].replace('Z', '+00:00')).strftime('%b %d, %Y')
+    total_views = int(dashboard.get('total_views', 0) or 0)
+    
+    # 7/30-day usage from the view history (absent until the fetcher has recorded some)
+    trend = dashboard.get('trend')
+    trend_html = ''
+    trend_attrs = ''
+    if trend:
+        stale_badge = '<span class="stale-badge">💤 Stale</span>' if trend['stale'] else ''
+        trend_html = f'''
+                <div class="dashboard-meta">
+                    <div class="meta-item"><span class="icon">📈</span> <span class="meta-trend">+{trend['views_7d']:,}</span> this week</div>
+                    <div class="meta-item"><span class="icon">🗓</span> +{trend['views_30d']:,} this month ({trend['per_day_30d']:,}/day)</div>
+                    {stale_badge}
+                </div>'''
+        trend_attrs = f' data-views7="{trend["views_7d"]}" data-views30="{trend["views_30d"]}" data-stale="{int(trend["stale"])}"'
+    panels_attr = f' data-panels="{panels_url}"' if panels_url else ''
+    
+    return f'''
+            <div class="dashboard-card" data-category="{category}" data-id="{card_id}"
+                 data-updated="{dashboard['updated']}" data-views="{total_views}"{trend_attrs}{panels_attr}>
+                {thumbnail_html}<div class="dashboard-name">{dashboard['name']}</div>
+                <div class="dashboard-description {desc_class}">{desc}</div>
+                {tags_html}
+                <div class="dashboard-meta">
+                    <div class="meta-item"><span class="icon">👤</span> {dashboard['owner']}</div>
+                    <div class="meta-item"><span class="icon">📁</span> {dashboard['project']}</div>
+                    <div class="meta-item"><span class="icon">📊</span> {dashboard['sheet_count']} sheets</div>
+                    <div class="meta-item"><span class="icon">👁</span> <span class="meta-highlight">{total_views:,}</span> views</div>
+                </div>
+                <div class="dashboard-meta">
+                    <div class="meta-item"><span class="icon">📅</span> Created: {created_date}</div>
+                    <div class="meta-item"><span class="icon">🔄</span> Updated: {updated_date}</div>
+                </div>{trend_html}
+                {data_sources_html}
+                {views_html}
+                <a href="{dashboard['url']}" class="dashboard-link" target="_blank">
+                    View Dashboard <span>→</span>
+                </a>
+            </div>
+'''
+
+def format_date(last_updated):
+    """'2025-06-28T17:00:00' -> 'June 28, 2025 at 05:00 PM' (unparseable dates pass through)"""
+    try:
+        dt = datetime.fromisoformat(last_updated.replace('Z', '+00:00'))
+        return dt.strftime('%B %d, %Y at %I:%M %p')
+    except:
+        return last_updated
+
+def template_version():
+    """Hash of this file - editing any template invalidates the cached cards"""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def panel_shard(dashboard):
+    """JSON with a card's data-source and sheet lists, or None when it has neither"""
+    if not dashboard['data_sources'] and not dashboard['views']:
+        return None
+    return json.dumps({
+        'sources': [[ds['name'], ds.get('type', 'unknown').upper()] for ds in dashboard['data_sources']],
+        'sheets': [[view['name'], view['url'], int(view.get('viewCount', 0) or 0)] for view in dashboard['views']]
+    }, ensure_ascii=False, separators=(',', ':'))
+
+def write_panels(dashboards, directory):
+    """Store every dashboard's panel shard under its content hash -> (URLs in order, files written)
+
+    Unchanged shards keep their file (and URL, so they can be cached as immutable); shards no
+    longer referenced are removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    existing = set(os.listdir(directory))
+    referenced = set()
+    urls = []
+    written = 0
+    for dashboard in dashboards:
+        shard = panel_shard(dashboard)
+        if shard is None:
+            urls.append(None)
+            continue
+        data = shard.encode('utf-8')
+        filename = hashlib.sha256(data).hexdigest()[:16] + '.json'
+        if filename not in existing and filename not in referenced:
+            path = os.path.join(directory, filename)
+            with open(f"{path}.tmp", 'wb') as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+            written += 1
+        referenced.add(filename)
+        urls.append(f"{os.path.basename(directory.rstrip('/'))}/{filename}")
+
+    for filename in existing - referenced:
+        if PANEL_FILE.match(filename):
+            os.remove(os.path.join(directory, filename))
+    return urls, written
+
+def render_cards(out, dashboards, category, first_id, cache=None, panels=None):
+    """Write one grid's cards, from the fragment cache where the record is unchanged -> cache keys
+
+    panels: shard URL per dashboard for lazy panels, or None to inline the lists.
+    """
+    panels = panels or [None] * len(dashboards)
+    if cache is None:
+        for card_id, (dashboard, panels_url) in enumerate(zip(dashboards, panels), first_id):
+            out.write(generate_card(dashboard, category, card_id, panels_url))
+        return []
+
+    keys = [cache.key(category, dashboard, panels_url) for dashboard, panels_url in zip(dashboards, panels)]
+    cache.prefetch(keys)
+    for card_id, (key, dashboard, panels_url) in enumerate(zip(keys, dashboards, panels), first_id):
+        fragment = cache.get(key, lambda: generate_card(dashboard, category, CARD_ID_SLOT, panels_url))
+        # data-id comes before any dashboard text, so the first occurrence is the slot
+        out.write(fragment.replace(CARD_ID_SLOT, str(card_id), 1))
+    return keys
+
+def shared_styles(bundle=None):
+    """The shared theme: inlined, or linked from the bundle ({'css': url, 'js': url})"""
+    if bundle:
+        return BUNDLE_STYLE.format(url=bundle['css'])
+    with open(SITE_CSS_PATH, 'r') as f:
+        return SHARED_STYLE.format(css=f.read().rstrip('\n'))
+
+def write_panels_script(out):
+    with open(PANELS_PATH, 'r') as f:
+        out.write(PANELS_SCRIPT.format(panels=f.read().rstrip('\n')))
+
+def render_page(out, production, playground, formatted_date, cache=None, panels=None, bundle=None):
+    """Stream the whole page to a text file object, one chunk per card
+
+    panels: shard URLs from write_panels() for production + playground, or None to inline the lists.
+    bundle: URLs of build_site.py's shared CSS/JS bundle, or None for a self-contained page.
+    """
+    counts = {
+        'production_count': len(production),
+        'playground_count': len(playground),
+        'total_count': len(production) + len(playground),
+        'formatted_date': formatted_date
+    }
+    out.write(PAGE_HEAD.format(shared_styles=shared_styles(bundle), **counts))
+    # Card ids are page positions, the same ids the search index uses
+    panels = panels or [None] * (len(production) + len(playground))
+    keys = render_cards(out, production, 'production', 0, cache, panels[:len(production)])
+    out.write(PLAYGROUND_HEAD.format(**counts))
+    keys += render_cards(out, playground, 'playground', len(production), cache, panels[len(production):])
+    out.write(PAGE_FOOT)
+    write_search_script(out, production + playground, cache, keys, bundle)
+    if not bundle:
+        write_panels_script(out)
+    out.write(STATIC_SCRIPT)
+
+def write_search_script(out, dashboards, cache=None, keys=None, bundle=None):
+    """Embed the search index for the cards in page order, plus search-index.js and its worker
+
+    With a cache, the index is reused while the cards (keys, in page order) are unchanged. With a
+    bundle the code comes from its script and the worker from search-worker.js next to the page.
+    """
+    if cache is None:
+        index = index_json(dashboards)
+    else:
+        index = cache.get(cache.key('search-index', keys), lambda: index_json(dashboards))
+    if bundle:
+        out.write(BUNDLE_SEARCH_SCRIPT.format(index=index, url=bundle['js']))
+        return
+    with open(SEARCH_PATH, 'r') as f:
+        search = f.read()
+    with open(WORKER_PATH, 'r') as f:
+        worker = f.read()
+    out.write(SEARCH_SCRIPT.format(index=index, search=search.rstrip('\n'), worker=worker.rstrip('\n')))
+
+def card_data(dashboard, base, panels_url=None):
+    """Compact JSON for one card - short keys, URLs relative to the shared base
+
+    With panels_url the lists become counts ('dc', 'vc') plus the shard URL ('pn').
+    """
+    def relative(url):
+        return url[len(base):] if base and url and url.startswith(base) else url
+
+    card = {
+        'n': dashboard['name'],
+        'd': dashboard['description'],
+        't': dashboard['tags'],
+        'o': dashboard['owner'],
+        'p': dashboard['project'],
+        's': dashboard['sheet_count'],
+        'v': int(dashboard.get('total_views', 0) or 0),
+        'c': datetime.fromisoformat(dashboard['created'].replace('Z', '+00:00')).strftime('%b %d, %Y'),
+        'u': datetime.fromisoformat(dashboard['updated'].replace('Z', '+00:00')).strftime('%b %d, %Y'),
+        'U': dashboard['updated'],
+        'l': relative(dashboard['url'])
+    }
+    if panels_url:
+        card['pn'] = panels_url
+        card['dc'] = len(dashboard['data_sources'])
+        card['vc'] = len(dashboard['views'])
+    else:
+        card['ds'] = [[ds['name'], ds.get('type', 'unknown').upper()] for ds in dashboard['data_sources']]
+        card['vw'] = [[view['name'], relative(view['url']), int(view.get('viewCount', 0) or 0)]
+                      for view in dashboard['views']]
+    thumbnail = dashboard.get('thumbnail')
+    if thumbnail:
+        card['th'] = [thumbnail['src'], thumbnail.get('width'), thumbnail.get('height')]
+    trend = dashboard.get('trend')
+    if trend:
+        card['tr'] = [trend['views_7d'], trend['views_30d'], f"{trend['per_day_30d']:,}", int(trend['stale'])]
+    return card
+
+def build_catalog(production, playground, panels=None):
+    """{'base', 'production': [...], 'playground': [...]} for virtual-grid.js"""
+    urls = [view['url'] for dashboard in production + playground for view in dashboard['views']]
+    base = os.path.commonprefix(urls)
+    base = base[:base.rfind('/') + 1]
+    panels = panels or [None] * (len(production) + len(playground))
+    return {
+        'base': base,
+        'production': [card_data(dashboard, base, panels_url) for dashboard, panels_url in zip(production, panels)],
+        'playground': [card_data(dashboard, base, panels_url)
+                       for dashboard, panels_url in zip(playground, panels[len(production):])]
+    }
+
+def render_virtual_page(out, production, playground, formatted_date, panels=None, bundle=None):
+    """Same page shell with empty grids, the catalog as JSON and the windowing renderer"""
+    counts = {
+        'production_count': len(production),
+        'playground_count': len(playground),
+        'total_count': len(production) + len(playground),
+        'formatted_date': formatted_date
+    }
+    out.write(PAGE_HEAD.format(shared_styles=shared_styles(bundle), **counts))
+    out.write(PLAYGROUND_HEAD.format(**counts))
+    out.write(PAGE_FOOT)
+    write_search_script(out, production + playground, bundle=bundle)
+    if not bundle:
+        write_panels_script(out)
+
+    catalog = json.dumps(build_catalog(production, playground, panels), ensure_ascii=False, separators=(',', ':'))
+    with open(RENDERER_PATH, 'r') as f:
+        renderer = f.read()
+    # "</" would end the <script> element early
+    out.write(VIRTUAL_SCRIPT.format(catalog=catalog.replace('</', '<\\/'), renderer=renderer.rstrip('\n')))
+
+def load_dashboards(path):
+    """(production, playground, last_updated) with each list sorted most recently updated first"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    
+    # Sort dashboards by updated date (descending - most recent first)
+    production = sorted(data['production'], key=lambda x: x.get('updated', ''), reverse=True)
+    playground = sorted(data['playground'], key=lambda x: x.get('updated', ''), reverse=True)
+    return production, playground, data.get('last_updated', datetime.now().isoformat())
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the dashboard portal HTML")
+    parser.add_argument('--input', default=DEFAULT_INPUT, help=f"Enhanced dashboards JSON (default: {DEFAULT_INPUT})")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f"HTML file to write (default: {DEFAULT_OUTPUT})")
+    parser.add_argument('--mode', choices=['static', 'virtual'], default='static',
+                        help="static: every card pre-rendered; virtual: JSON catalog + windowed grid for large catalogs")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f"Rendered-card cache reused between static builds (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--no-cache', action='store_true', help="Render every card from scratch")
+    parser.add_argument('--lazy-panels', action='store_true',
+                        help=f"Move the data-source and sheet lists to {PANELS_DIR}/ shards next to the page, "
+                             "fetched on first expand (deploy that folder with it; build_site.py always does this)")
+    args = parser.parse_args()
+
+    production, playground, last_updated = load_dashboards(args.input)
+
+    panels = None
+    if args.lazy_panels:
+        panels_dir = os.path.join(os.path.dirname(os.path.abspath(args.output)), PANELS_DIR)
+        panels, written = write_panels(production + playground, panels_dir)
+        print(f"🗂️  Panels: {sum(1 for url in panels if url)} shards in {PANELS_DIR}/ ({written} written)")
+
+    # Write the HTML file
+    cache = None
+    with open(args.output, 'w') as f:
+        if args.mode == 'virtual':
+            render_virtual_page(f, production, playground, format_date(last_updated), panels)
+        else:
+            cache = None if args.no_cache else FragmentCache(args.cache, template_version())
+            render_page(f, production, playground, format_date(last_updated), cache, panels)
+    if cache is not None:
+        cache.save()
+        cache.close()
+
+    print(f"✅ Enhanced HTML generated: {args.output} ({args.mode} mode)")
+    if cache is not None:
+        # The search index is one more fragment
+        print(f"🧩 Fragment cache: {cache.hits} hits, {cache.misses} re-rendered")
+    print(f"📊 Total dashboards: {len(production) + len(playground)}")
+    print("✨ Features included:")
+    print("   ✓ Beautiful dark theme matching Knowledge Base")
+    print("   ✓ Animated background and card effects")
+    print("   ✓ Ranked, typo-tolerant search by name, tags, owner, description, data source, sheet")
+    print("   ✓ Filter by category (Production/Playground)")
+    print("   ✓ Collapsible data sources and sheets sections")
+    print("   ✓ View counts for each sheet")
+    print("   ✓ 7/30-day view trends and sorting")
+    print("   ✓ Keyboard shortcut (Cmd+K) for search")
+    print("   ✓ Responsive design")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+On-disk (SQLite) cache for Tableau REST GET responses
+Per-endpoint TTLs, ETag/Last-Modified revalidation and size-bounded LRU eviction
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_PATH = '.tableau_cache.sqlite'
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_TTL = 3600
+
+# (path regex, seconds) - first match wins
+DEFAULT_TTLS = [
+    (r'/workbooks/[^/]+/connections$', 24 * 3600),
+    (r'/workbooks/[^/]+/views$', 6 * 3600),
+    (r'/sites/[^/]+/views$', 6 * 3600),
+    (r'/sites/[^/]+/workbooks$', 3600),
+]
+
+class CacheMiss(Exception):
+    """Raised in cache-only mode when a request has never been cached"""
+
+def make_key(method, url, params=None):
+    """Cache key from method + URL + sorted query params"""
+    query = urlencode(sorted((params or {}).items()))
+    return f"{method.upper()} {url}?{query}"
+
+def to_response(url, status, headers, body):
+    """Rebuild a requests.Response from a cache row"""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers = CaseInsensitiveDict(json.loads(headers))
+    response._content = body
+    response.from_cache = True
+    return response
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), seconds) for pattern, seconds in (ttls or DEFAULT_TTLS)]
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+
+        # One connection shared by the worker threads, serialized by self.lock
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+        """)
+        self.db.commit()
+
+    def ttl_for(self, url):
+        path = urlparse(url).path
+        for pattern, seconds in self.ttls:
+            if pattern.search(path):
+                return seconds
+        return self.default_ttl
+
+    def get(self, key):
+        """Cached entry as a dict (with 'fresh' set from the TTL), or None"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+
+        url, status, headers, body, etag, last_modified, stored_at = row
+        return {
+            'response': to_response(url, status, headers, body),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': time.time() - stored_at < self.ttl_for(url)
+        }
+
+    def store(self, key, response):
+        body = response.content
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(dict(response.headers)), body,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now, len(body)))
+            self._evict()
+            self.db.commit()
+
+    def touch(self, key):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        with self.lock:
+            now = time.time()
+            self.db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.db.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def get_meta(self, name):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name, value):
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, value))
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Tableau REST API, for benchmarking and regression-testing the fetcher
+Serves signin, workbooks, site views, workbook views and connections over a synthetic catalog
+"""
+import argparse
+import json
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Same projects the fetcher asks for, plus one it should never list
+PROJECTS = ['ROC Protocol', 'Triage', 'ROC', 'Playground', 'Mor', 'Guy', 'Yahel', 'Finance']
+OWNERS = ['mor.h', 'guy.d', 'yahel.o', 'igor.g']
+NAME_WORDS = ['Hourly', 'Daily', 'Revenue', 'Triage', 'Margin', 'Spend', 'Publisher', 'Advertiser',
+              'ROC', 'Health', 'Trend', 'Supply', 'Alerts', 'Investigation', 'CPA']
+DB_TYPES = ['vertica', 'bigquery', 'sqlproxy']
+
+def build_catalog(workbooks=100, views_per_workbook=5, connections_per_workbook=2, seed=42):
+    """Deterministic synthetic catalog: list of workbooks, each with 'views' and 'connections'"""
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(workbooks):
+        workbook_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        name = f"{' '.join(rng.sample(NAME_WORDS, 2))} {i}"
+        content_url = re.sub(r'\W', '', name)
+        day = 1 + rng.randrange(28)
+        views = []
+        for v in range(views_per_workbook):
+            view_name = f"Sheet {v + 1}"
+            views.append({
+                'id': str(uuid.UUID(int=rng.getrandbits(128))),
+                'name': view_name,
+                'contentUrl': f"{content_url}/sheets/Sheet{v + 1}",
+                'workbook': {'id': workbook_id},
+                'usage': {'totalViewCount': str(rng.randrange(500))}
+            })
+        connections = []
+        for c in range(connections_per_workbook):
+            db_type = rng.choice(DB_TYPES)
+            connections.append({
+                'id': str(uuid.UUID(int=rng.getrandbits(128))),
+                'type': db_type,
+                'serverAddress': f"{db_type}.example.com",
+                'datasource': {'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': f"{name} Source {c + 1}"}
+            })
+        catalog.append({
+            'id': workbook_id,
+            'name': name,
+            'description': '',
+            'contentUrl': content_url,
+            'project': {'id': str(i % len(PROJECTS)), 'name': PROJECTS[i % len(PROJECTS)]},
+            'owner': {'id': str(i % len(OWNERS)), 'name': OWNERS[i % len(OWNERS)]},
+            'createdAt': f"2025-01-{day:02d}T10:00:00Z",
+            'updatedAt': f"2025-06-{day:02d}T{rng.randrange(24):02d}:00:00Z",
+            'size': str(rng.randrange(1, 50)),
+            'tags': {'tag': [{'label': 'roc'}] if i % 5 == 0 else []},
+            'views': views,
+            'connections': connections
+        })
+    return catalog
+
+def preview_png(view_id, width=640, height=360):
+    """Solid-colour PNG standing in for a view's previewImage"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    color = bytes.fromhex(view_id.replace('-', '')[:6])
+    raw = (b'\x00' + color * width) * height
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+def parse_filter(expression):
+    """Tableau filter=field:op:value[,...] -> list of (field, op, values)"""
+    clauses = []
+    for clause in re.findall(r'[^,\[]+(?:\[[^\]]*\])?', expression or ''):
+        field, op, value = clause.split(':', 2)
+        values = value[1:-1].split(',') if value.startswith('[') else [value]
+        clauses.append((field, op, values))
+    return clauses
+
+FILTER_FIELDS = {
+    'projectName': lambda wb: wb['project']['name'],
+    'ownerName': lambda wb: wb['owner']['name'],
+    'name': lambda wb: wb['name'],
+    'updatedAt': lambda wb: wb['updatedAt'],
+}
+
+def matches(wb, clauses):
+    for field, op, values in clauses:
+        actual = FILTER_FIELDS[field](wb)
+        if op == 'eq' and actual != values[0]:
+            return False
+        if op == 'in' and actual not in values:
+            return False
+        if op == 'gt' and not actual > values[0]:
+            return False
+    return True
+
+class MockTableauServer:
+    """Threaded mock server; use start()/stop() or run as a script"""
+
+    def __init__(self, catalog, port=0, latency_ms=0, error_rate=0.0, rate_limit_rate=0.0,
+                 api_version='3.19', seed=42):
+        self.catalog = catalog
+        self.by_id = {wb['id']: wb for wb in catalog}
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.api_version = api_version
+        self.rng = random.Random(seed)
+        self.site_id = '00000000-0000-4000-8000-000000000000'
+        self.token = 'mock-token'
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats.clear()
+
+    def record(self, endpoint, status):
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats[f"{endpoint} {status}"] += 1
+
+    def inject_fault(self):
+        """Status code to fail with (429 / 5xx) or None, per the configured rates"""
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+    def page(self, items, query, collection, item):
+        page_size = int(query.get('pageSize', ['100'])[0])
+        page_number = int(query.get('pageNumber', ['1'])[0])
+        start = (page_number - 1) * page_size
+        return {
+            'pagination': {'pageNumber': str(page_number), 'pageSize': str(page_size),
+                           'totalAvailable': str(len(items))},
+            collection: {item: items[start:start + page_size]}
+        }
+
+    def route(self, method, path, query):
+        """(endpoint template, status, payload) for a request"""
+        prefix = f"/api/{self.api_version}"
+        if method == 'POST' and path == f"{prefix}/auth/signin":
+            return 'auth/signin', 200, {'credentials': {'token': self.token, 'site': {'id': self.site_id},
+                                                        'estimatedTimeToExpiration': '4:00:00'}}
+
+        site = f"{prefix}/sites/{self.site_id}"
+        if path == f"{site}/workbooks":
+            workbooks = [wb for wb in self.catalog if matches(wb, parse_filter(query.get('filter', [''])[0]))]
+            sort = query.get('sort', [''])[0]
+            if sort:
+                field, direction = sort.split(':')
+                workbooks.sort(key=FILTER_FIELDS[field], reverse=direction == 'desc')
+            listing = [{k: v for k, v in wb.items() if k not in ('views', 'connections')} for wb in workbooks]
+            return 'sites/{id}/workbooks', 200, self.page(listing, query, 'workbooks', 'workbook')
+        if path == f"{site}/views":
+            clauses = parse_filter(query.get('filter', [''])[0])
+            views = [view for wb in self.catalog if matches(wb, clauses) for view in wb['views']]
+            return 'sites/{id}/views', 200, self.page(views, query, 'views', 'view')
+
+        match = re.fullmatch(rf"{site}/workbooks/([^/]+)/views/([^/]+)/previewImage", path)
+        if match and match.group(1) in self.by_id:
+            if any(view['id'] == match.group(2) for view in self.by_id[match.group(1)]['views']):
+                return 'sites/{id}/workbooks/{id}/views/{id}/previewImage', 200, preview_png(match.group(2))
+
+        match = re.fullmatch(rf"{site}/workbooks/([^/]+)/(views|connections)", path)
+        if match and match.group(1) in self.by_id:
+            wb = self.by_id[match.group(1)]
+            if match.group(2) == 'views':
+                return 'sites/{id}/workbooks/{id}/views', 200, self.page(wb['views'], query, 'views', 'view')
+            return ('sites/{id}/workbooks/{id}/connections', 200,
+                    self.page(wb['connections'], query, 'connections', 'connection'))
+
+        return 'unknown', 404, {'error': {'summary': 'Not Found'}}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, like the real server, so connection pooling shows up in the numbers
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload, headers=None):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'image/png' if isinstance(payload, bytes) else 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_request(self, method):
+                length = int(self.headers.get('Content-Length', 0) or 0)
+                if length:
+                    self.rfile.read(length)
+                url = urlparse(self.path)
+
+                if url.path == '/_stats':
+                    return self.send_json(200, dict(server.stats))
+
+                if server.latency_ms:
+                    time.sleep(server.rng.uniform(0.5, 1.5) * server.latency_ms / 1000)
+
+                endpoint, status, payload = server.route(method, url.path, parse_qs(url.query))
+                if endpoint != 'auth/signin' and self.headers.get('X-Tableau-Auth') != server.token:
+                    server.record(endpoint, 401)
+                    return self.send_json(401, {'error': {'summary': 'Signin Error'}})
+
+                fault = server.inject_fault()
+                if fault:
+                    server.record(endpoint, fault)
+                    headers = {'Retry-After': '0'} if fault == 429 else None
+                    return self.send_json(fault, {'error': {'summary': 'Injected fault'}}, headers)
+
+                server.record(endpoint, status)
+                self.send_json(status, payload)
+
+            def do_GET(self):
+                self.handle_request('GET')
+
+            def do_POST(self):
+                self.handle_request('POST')
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Tableau REST server with a synthetic catalog")
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--workbooks', type=int, default=100)
+    parser.add_argument('--views-per-workbook', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = build_catalog(args.workbooks, args.views_per_workbook, seed=args.seed)
+    server = MockTableauServer(catalog, args.port, args.latency_ms, args.error_rate, args.rate_limit_rate,
+                               seed=args.seed)
+    print(f"🧪 Mock Tableau server on {server.url} ({len(catalog)} workbooks)")
+    print(f"   export TABLEAU_SERVER={server.url} TABLEAU_PAT_NAME=mock TABLEAU_PAT_VALUE=mock")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
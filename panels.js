@@ -0,0 +1,58 @@
+// Lazy "Data Sources" / "Sheets" panels of the dashboard cards (generate_enhanced_html.py)
+// Cards carry only the counts; the lists live in a content-hashed panels/<hash>.json shard per
+// dashboard, fetched the first time one of its panels is expanded and memoized afterwards.
+const panelShards = new Map();
+
+function escapePanelHtml(value) {
+    return String(value).replace(/[&<>"']/g, c => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[c]);
+}
+
+function loadPanelShard(url) {
+    if (!panelShards.has(url)) {
+        panelShards.set(url, fetch(url).then(response => {
+            if (!response.ok) throw new Error(`${url}: HTTP ${response.status}`);
+            return response.json();
+        }).catch(error => {
+            // Let the next expand try again
+            panelShards.delete(url);
+            throw error;
+        }));
+    }
+    return panelShards.get(url);
+}
+
+// Same markup as the inline lists in generate_card()
+function renderPanel(kind, shard) {
+    if (kind === 'sources') {
+        return shard.sources.map(([name, type]) => {
+            const badge = type.toLowerCase().includes('vertica') ? 'vertica'
+                : type.toLowerCase().includes('bigquery') ? 'bigquery' : 'other';
+            return `<div class="data-source"><span class="ds-badge ${badge}">${escapePanelHtml(type)}</span>${escapePanelHtml(name)}</div>`;
+        }).join('');
+    }
+    const links = shard.sheets.map(([name, url, count]) => {
+        const countDisplay = count > 0 ? ` <span class="view-count">(${Number(count).toLocaleString('en-US')}👁)</span>` : '';
+        return `<a href="${escapePanelHtml(url)}" class="view-link" target="_blank">${escapePanelHtml(name)}${countDisplay}</a>`;
+    });
+    return `<div class="view-links">${links.join('')}</div>`;
+}
+
+// Fill a lazy panel from its card's shard; resolves once the list is in place (or on failure)
+function fillPanel(header) {
+    const section = header.parentElement;
+    const card = section.closest('.dashboard-card');
+    if (!section.dataset.panel || !card || !card.dataset.panels || section.dataset.loaded) {
+        return Promise.resolve();
+    }
+    section.dataset.loaded = '1';
+    const inner = section.querySelector('.collapsible-inner');
+    inner.innerHTML = '<div class="panel-status">Loading…</div>';
+    return loadPanelShard(card.dataset.panels).then(shard => {
+        inner.innerHTML = renderPanel(section.dataset.panel, shard);
+    }).catch(() => {
+        delete section.dataset.loaded;
+        inner.innerHTML = '<div class="panel-status">Couldn\'t load this list</div>';
+    });
+}
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Long-running refresh daemon for the ROC dashboard portal
+Polls a cheap change signal and only re-runs the fetch + generate steps when something changed
+"""
+import argparse
+import fcntl
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from catalog_rules import DEFAULT_RULES_PATH, load_rules
+from fetch_enhanced_dashboard_data import CATALOG_CATEGORIES
+from tableau_client import TableauClient
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FETCHER = os.path.join(HERE, 'fetch_enhanced_dashboard_data.py')
+GENERATOR = os.path.join(HERE, 'generate_enhanced_html.py')
+
+DEFAULT_STATE_PATH = '.refresh_daemon_state.json'
+DEFAULT_LOCK_PATH = '.refresh_daemon.lock'
+
+def log(message):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+def get_project_signal(client, site_id, project_name):
+    """(latest updatedAt, workbook count) for a project from one sorted page-size-1 query"""
+    params = {
+        "filter": f"projectName:eq:{project_name}",
+        "sort": "updatedAt:desc",
+        "pageSize": 1,
+        "pageNumber": 1
+    }
+    data = client.get_json(f"sites/{site_id}/workbooks", params=params)
+    workbooks = data.get('workbooks', {}).get('workbook', [])
+    total_available = int(data.get('pagination', {}).get('totalAvailable', 0))
+    return [workbooks[0].get('updatedAt', '') if workbooks else '', total_available]
+
+def get_change_signal(client, site_id, projects):
+    """{project: [latest updatedAt, workbook count]} - the count catches deletions too"""
+    with ThreadPoolExecutor(max_workers=len(projects)) as executor:
+        signals = executor.map(lambda name: get_project_signal(client, site_id, name), projects)
+        return dict(zip(projects, signals))
+
+def load_state(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_state(path, state):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+class SingleFlightLock:
+    """Non-blocking exclusive file lock so only one refresh runs at a time, across processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def acquire(self):
+        self.handle = open(self.path, 'w')
+        try:
+            fcntl.flock(self.handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            self.handle.close()
+            self.handle = None
+            return False
+
+    def release(self):
+        if self.handle:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+            self.handle.close()
+            self.handle = None
+
+def run_step(cmd):
+    log(f"▶️  {' '.join(os.path.basename(part) for part in cmd[1:])}")
+    result = subprocess.run(cmd, cwd=os.getcwd())
+    if result.returncode != 0:
+        log(f"❌ Step failed with exit code {result.returncode}")
+    return result.returncode == 0
+
+def refresh(fetch_args, rules_path, refresh_usage=False):
+    """Incremental fetch followed by HTML regeneration"""
+    cmd = [sys.executable, FETCHER, '--incremental', '--rules', rules_path] + fetch_args
+    if refresh_usage:
+        cmd += ['--refresh-usage', '--bulk-views']
+    return run_step(cmd) and run_step([sys.executable, GENERATOR])
+
+def jittered(seconds, jitter):
+    return max(1.0, seconds * random.uniform(1 - jitter, 1 + jitter))
+
+def poll_once(client, site_id, args, state, lock):
+    """One daemon cycle; returns the (possibly updated) state"""
+    projects = load_rules(args.rules).project_names(CATALOG_CATEGORIES)
+    signal = get_change_signal(client, site_id, projects)
+    changed = [name for name in projects if state.get('signal', {}).get(name) != signal[name]]
+    usage_due = args.usage_interval and time.time() - state.get('usage_refreshed_at', 0) >= args.usage_interval
+
+    if not changed and not usage_due:
+        log("💤 No changes")
+        return state
+
+    if not lock.acquire():
+        log("🔒 Another refresh is running - skipping this cycle")
+        return state
+
+    try:
+        if changed:
+            log(f"🔄 Changes in: {', '.join(changed)}")
+        else:
+            log("👁  Refreshing view counts")
+        if refresh(args.fetch_args, args.rules, refresh_usage=usage_due):
+            state = dict(state, signal=signal, refreshed_at=time.time())
+            if usage_due:
+                state['usage_refreshed_at'] = time.time()
+            save_state(args.state, state)
+            log("✅ Portal refreshed")
+    finally:
+        lock.release()
+    return state
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll Tableau for changes and refresh the dashboard portal")
+    parser.add_argument('--interval', type=float, default=300,
+                        help="Seconds between polls (default: 300)")
+    parser.add_argument('--jitter', type=float, default=0.2,
+                        help="Randomize each sleep by +/- this fraction (default: 0.2)")
+    parser.add_argument('--usage-interval', type=float, default=24 * 3600,
+                        help="Also refresh view counts this often in seconds, 0 to disable (default: 86400)")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH,
+                        help=f"Last seen change signal (default: {DEFAULT_STATE_PATH})")
+    parser.add_argument('--lock', default=DEFAULT_LOCK_PATH,
+                        help=f"Single-flight lock file (default: {DEFAULT_LOCK_PATH})")
+    parser.add_argument('--rules', default=DEFAULT_RULES_PATH,
+                        help="Inclusion rules shared with the fetcher, re-read every cycle (default: catalog_rules.json)")
+    parser.add_argument('--once', action='store_true', help="Run a single poll cycle and exit")
+    parser.add_argument('fetch_args', nargs=argparse.REMAINDER,
+                        help="Extra arguments passed to the fetcher, after --")
+    args = parser.parse_args()
+    # Only the separator itself - a later -- belongs to the fetcher (newer Pythons drop it already)
+    if args.fetch_args[:1] == ['--']:
+        args.fetch_args = args.fetch_args[1:]
+
+    client = TableauClient.from_credentials()
+    _, site_id = client.sign_in()
+    lock = SingleFlightLock(args.lock)
+    state = load_state(args.state)
+    log(f"🚀 Watching {len(load_rules(args.rules).project_names(CATALOG_CATEGORIES))} projects every ~{args.interval:.0f}s")
+
+    while True:
+        try:
+            state = poll_once(client, site_id, args, state, lock)
+        except Exception as e:
+            # Keep the daemon alive through transient Tableau outages
+            log(f"⚠️ Poll failed: {e}")
+        if args.once:
+            break
+        time.sleep(jittered(args.interval, args.jitter))
+
+if __name__ == '__main__':
+    main()
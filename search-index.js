@@ -0,0 +1,254 @@
+// Inverted-index search for the portal pages (dashboard index built by search_index.py)
+// createSearchIndex(data).query() returns ids in relevance order, or null for an empty query.
+// Query words match indexed words exactly, by prefix, or - through the trigram index - within a
+// small edit distance, so "triag" and "verticca" still find "triage" and "vertica".
+const MIN_FUZZY_LENGTH = 4;
+
+function tokenize(text) {
+    return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+}
+
+// Same padding as word_trigrams() in search_index.py, so word starts and ends count
+function wordTrigrams(word) {
+    const padded = ` ${word} `;
+    const grams = new Set();
+    for (let i = 0; i + 3 <= padded.length; i++) {
+        grams.add(padded.slice(i, i + 3));
+    }
+    return grams;
+}
+
+// Ascending ids -> [first, delta, delta, ...]
+function deltaEncode(ids) {
+    let previous = 0;
+    return ids.map(id => {
+        const delta = id - previous;
+        previous = id;
+        return delta;
+    });
+}
+
+// Index in the search_index.py layout for hand-made pages: docs are {field: text} objects (ids are
+// their positions, an optional 'views' number breaks ties), weights map searchable fields to scores
+function buildSearchIndex(docs, weights) {
+    const postings = new Map();
+    docs.forEach((doc, id) => {
+        for (const field of Object.keys(weights)) {
+            // A word counts once per field
+            for (const token of new Set(tokenize(String(doc[field] || '')))) {
+                if (!postings.has(token)) postings.set(token, new Map());
+                const scores = postings.get(token);
+                scores.set(id, (scores.get(id) || 0) + weights[field]);
+            }
+        }
+    });
+
+    const vocab = Array.from(postings.keys()).sort();
+    const positions = new Map();
+    vocab.forEach((token, position) => {
+        for (const gram of wordTrigrams(token)) {
+            if (!positions.has(gram)) positions.set(gram, []);
+            positions.get(gram).push(position);
+        }
+    });
+    const trigrams = {};
+    for (const gram of Array.from(positions.keys()).sort()) {
+        trigrams[gram] = deltaEncode(positions.get(gram));
+    }
+
+    return {
+        vocab,
+        postings: vocab.map(token => {
+            const entries = Array.from(postings.get(token)).sort((a, b) => a[0] - b[0]);
+            const deltas = deltaEncode(entries.map(entry => entry[0]));
+            return entries.flatMap((entry, i) => [deltas[i], entry[1]]);
+        }),
+        trigrams,
+        views: docs.map(doc => Number(doc.views) || 0)
+    };
+}
+
+// Optimal string alignment distance (a transposition is one edit); stops at limit + 1
+function editDistance(a, b, limit) {
+    if (Math.abs(a.length - b.length) > limit) return limit + 1;
+    let before = null;
+    let previous = Array.from({ length: b.length + 1 }, (_, j) => j);
+    for (let i = 1; i <= a.length; i++) {
+        const row = [i];
+        let best = i;
+        for (let j = 1; j <= b.length; j++) {
+            let distance = Math.min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (a[i - 1] === b[j - 1] ? 0 : 1));
+            if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+                distance = Math.min(distance, before[j - 2] + 1);
+            }
+            row.push(distance);
+            best = Math.min(best, distance);
+        }
+        if (best > limit) return limit + 1;
+        before = previous;
+        previous = row;
+    }
+    return previous[b.length];
+}
+
+function createSearchIndex(data) {
+    const vocab = data.vocab;
+    const decoded = new Array(vocab.length);
+    const decodedTrigrams = new Map();
+
+    // Posting list of one vocabulary entry as [id, score, ...], decoded on first use
+    function postings(position) {
+        if (!decoded[position]) {
+            const flat = data.postings[position];
+            const list = new Array(flat.length);
+            let id = 0;
+            for (let i = 0; i < flat.length; i += 2) {
+                id += flat[i];
+                list[i] = id;
+                list[i + 1] = flat[i + 1];
+            }
+            decoded[position] = list;
+        }
+        return decoded[position];
+    }
+
+    // Vocabulary positions of the words containing a trigram
+    function trigramPositions(gram) {
+        if (!decodedTrigrams.has(gram)) {
+            const deltas = Object.prototype.hasOwnProperty.call(data.trigrams, gram) ? data.trigrams[gram] : [];
+            let position = 0;
+            decodedTrigrams.set(gram, deltas.map(delta => (position += delta)));
+        }
+        return decodedTrigrams.get(gram);
+    }
+
+    // First vocabulary position >= word
+    function lowerBound(word) {
+        let lo = 0, hi = vocab.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (vocab[mid] < word) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    // [[vocabulary position, edit distance], ...] for words close to, but not starting with, word
+    function fuzzyMatches(word) {
+        if (word.length < MIN_FUZZY_LENGTH) return [];
+        const limit = word.length < 7 ? 1 : 2;
+        const grams = wordTrigrams(word);
+        const shared = new Map();
+        for (const gram of grams) {
+            for (const position of trigramPositions(gram)) {
+                shared.set(position, (shared.get(position) || 0) + 1);
+            }
+        }
+
+        // One edit breaks at most three trigrams (a transposition four), so close words share this many
+        const needed = Math.max(1, grams.size - 4 * limit);
+        const matches = [];
+        for (const [position, count] of shared) {
+            if (count < needed || vocab[position].startsWith(word)) continue;
+            const distance = editDistance(word, vocab[position], limit);
+            if (distance <= limit) matches.push([position, distance]);
+        }
+        return matches;
+    }
+
+    // {id: score} for one query word: exact matches score the full weight, prefixes half,
+    // typos less again; a card keeps its best match
+    function matchWord(word) {
+        const scores = new Map();
+        function add(position, factor) {
+            const list = postings(position);
+            for (let i = 0; i < list.length; i += 2) {
+                const score = list[i + 1] * factor;
+                if (score > (scores.get(list[i]) || 0)) scores.set(list[i], score);
+            }
+        }
+        for (let position = lowerBound(word); position < vocab.length && vocab[position].startsWith(word); position++) {
+            add(position, vocab[position] === word ? 1 : 0.5);
+        }
+        for (const [position, distance] of fuzzyMatches(word)) {
+            add(position, 0.5 / (1 + distance));
+        }
+        return scores;
+    }
+
+    function query(text) {
+        const words = tokenize(text);
+        if (!words.length) return null;
+
+        // Intersect, starting from the shortest posting set
+        const matches = words.map(matchWord).sort((a, b) => a.size - b.size);
+        const totals = new Map(matches[0]);
+        for (const scores of matches.slice(1)) {
+            for (const [id, score] of totals) {
+                if (scores.has(id)) totals.set(id, score + scores.get(id));
+                else totals.delete(id);
+            }
+        }
+
+        return Array.from(totals.keys()).sort((a, b) =>
+            (totals.get(b) - totals.get(a)) || (data.views[b] - data.views[a]) || (a - b));
+    }
+
+    return { query };
+}
+
+// Page side: answers queries from search-worker.js so typing never waits on matching, and falls
+// back to the main thread where workers are unavailable (old browsers, file:// pages).
+// source is {json: index text from search_index.py} or {docs, weights} for buildSearchIndex();
+// the worker comes from an inline <script id="search-worker"> or from workerUrl.
+// query(text, callback) calls back with the ranked ids - only for the newest query.
+function createSearchClient(source, workerUrl) {
+    const pending = new Map();
+    let worker = null;
+    let local = null;
+    let latest = 0;
+
+    function localIndex() {
+        if (!local) {
+            local = createSearchIndex(source.json ? JSON.parse(source.json) : buildSearchIndex(source.docs, source.weights));
+        }
+        return local;
+    }
+
+    function fallBack() {
+        if (worker) worker.terminate();
+        worker = null;
+        const request = pending.get(latest);
+        pending.clear();
+        if (request) request.callback(localIndex().query(request.text));
+    }
+
+    try {
+        const inline = document.getElementById('search-worker');
+        const url = inline ? URL.createObjectURL(new Blob([inline.textContent], { type: 'text/javascript' })) : workerUrl;
+        if (url) {
+            worker = new Worker(url);
+            worker.onmessage = event => {
+                const request = pending.get(event.data.seq);
+                pending.delete(event.data.seq);
+                // Answers to superseded queries are dropped
+                if (request && event.data.seq === latest) request.callback(event.data.ids);
+            };
+            worker.onerror = fallBack;
+            worker.postMessage({ type: 'load', json: source.json, docs: source.docs, weights: source.weights });
+        }
+    } catch (error) {
+        worker = null;
+    }
+
+    function query(text, callback) {
+        const seq = ++latest;
+        if (!worker) {
+            callback(localIndex().query(text));
+            return;
+        }
+        pending.set(seq, { text, callback });
+        worker.postMessage({ type: 'query', seq, text });
+    }
+
+    return { query };
+}
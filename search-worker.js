@@ -0,0 +1,17 @@
+// Web Worker half of createSearchClient() in search-index.js: builds (or parses) the index once,
+// then answers {type: 'query', seq, text} messages with {seq, ids}.
+// Inlined pages prepend search-index.js; as a file next to the pages it loads it itself.
+if (typeof createSearchIndex === 'undefined') {
+    importScripts('search-index.js');
+}
+
+let searchIndex = null;
+
+self.onmessage = event => {
+    const message = event.data;
+    if (message.type === 'load') {
+        searchIndex = createSearchIndex(message.json ? JSON.parse(message.json) : buildSearchIndex(message.docs, message.weights));
+    } else if (message.type === 'query') {
+        self.postMessage({ seq: message.seq, ids: searchIndex.query(message.text) });
+    }
+};
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Build-time inverted search index for the dashboard portal
+Tokens from names, tags, owners, descriptions, data sources and sheet names map to the cards
+containing them, scored by field weight; search-index.js answers queries in the page by
+intersecting the posting lists of each query word (prefix-matched against the sorted vocabulary,
+plus typo matches found through the vocabulary's trigram index).
+
+Index layout (JSON, embedded in the page):
+
+    {"vocab": ["advertiser", "alerts", ...],            sorted tokens
+     "postings": [[3, 10, 2, 6], ...],                   per token: card id deltas and scores
+     "trigrams": {" ad": [0, 57], ...},                  per trigram: vocab position deltas
+     "views": [1053, 12, ...]}                           per card: total views, the tie-breaker
+"""
+import json
+import re
+from collections import defaultdict
+
+# Letters and digits only, same as the /[\p{L}\p{N}]+/u tokenizer in search-index.js
+TOKEN = re.compile(r'[^\W_]+')
+
+FIELD_WEIGHTS = {
+    'name': 10,
+    'tags': 6,
+    'owner': 4,
+    'description': 3,
+    'data_sources': 2,
+    'sheets': 2,
+}
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+def word_trigrams(word):
+    """Trigrams of a word padded with spaces, same as wordTrigrams() in search-index.js"""
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def delta_encode(values):
+    return [value - previous for previous, value in zip([0] + values, values)]
+
+def field_texts(dashboard):
+    """(field, text) pairs that are searchable for a dashboard record"""
+    return [
+        ('name', dashboard.get('name', '')),
+        ('tags', ' '.join(dashboard.get('tags', []))),
+        ('owner', dashboard.get('owner', '')),
+        ('description', dashboard.get('description', '')),
+        ('data_sources', ' '.join(ds.get('name', '') for ds in dashboard.get('data_sources', []))),
+        ('sheets', ' '.join(view.get('name', '') for view in dashboard.get('views', []))),
+    ]
+
+def build_search_index(dashboards):
+    """Inverted index over dashboards; card ids are positions in the given list"""
+    postings = defaultdict(dict)
+    for card_id, dashboard in enumerate(dashboards):
+        for field, text in field_texts(dashboard):
+            weight = FIELD_WEIGHTS[field]
+            # A word counts once per field, so long sheet lists don't drown out the name
+            for token in set(tokenize(text)):
+                postings[token][card_id] = postings[token].get(card_id, 0) + weight
+
+    vocab = sorted(postings)
+    encoded = []
+    for token in vocab:
+        flat = []
+        previous = 0
+        for card_id, score in sorted(postings[token].items()):
+            flat += [card_id - previous, score]
+            previous = card_id
+        encoded.append(flat)
+
+    trigrams = defaultdict(list)
+    for position, token in enumerate(vocab):
+        for gram in word_trigrams(token):
+            trigrams[gram].append(position)
+
+    return {
+        'vocab': vocab,
+        'postings': encoded,
+        'trigrams': {gram: delta_encode(positions) for gram, positions in sorted(trigrams.items())},
+        'views': [int(dashboard.get('total_views', 0) or 0) for dashboard in dashboards]
+    }
+
+def index_json(dashboards):
+    """Compact JSON for a <script type="application/json"> element"""
+    payload = json.dumps(build_search_index(dashboards), ensure_ascii=False, separators=(',', ':'))
+    # "</" would end the <script> element early
+    return payload.replace('</', '<\\/')
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Shared Tableau REST client with pooled connections, retries and timeouts
+Used by fetch_enhanced_dashboard_data.py and generate_dashboard_html.py
+"""
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import CacheMiss, make_key
+
+API_VERSION = "3.19"
+
+# Status codes worth retrying - rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_TIMEOUT = (10, 60)  # (connect, read) seconds
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30.0
+DEFAULT_POOL_SIZE = 32
+
+# Saved credentials token, reused across runs until it is about to expire
+DEFAULT_SESSION_PATH = '.tableau_session.json'
+DEFAULT_TOKEN_TTL = 3 * 3600  # Tableau's default session lifetime is 240 minutes
+TOKEN_EXPIRY_MARGIN = 300
+
+def get_credentials():
+    """Read Tableau credentials from environment variables or mcp.json"""
+    # Try environment variables first (GitHub Actions)
+    if os.environ.get('TABLEAU_SERVER'):
+        return {
+            'SERVER': os.environ.get('TABLEAU_SERVER'),
+            'SITE_NAME': os.environ.get('TABLEAU_SITE_NAME', ''),
+            'PAT_NAME': os.environ.get('TABLEAU_PAT_NAME'),
+            'PAT_VALUE': os.environ.get('TABLEAU_PAT_VALUE')
+        }
+
+    # Fall back to mcp.json (local use) - either the MCP server layout or a plain "tableau" block
+    try:
+        with open('mcp.json', 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        raise Exception("No credentials found. Set environment variables or create mcp.json")
+
+    tableau = config.get('mcpServers', {}).get('tableau', {}).get('env') or config.get('tableau', {})
+    return {
+        'SERVER': tableau.get('SERVER'),
+        'SITE_NAME': tableau.get('SITE_NAME', ''),
+        'PAT_NAME': tableau.get('PAT_NAME'),
+        'PAT_VALUE': tableau.get('PAT_VALUE')
+    }
+
+def parse_expiration(value):
+    """Seconds from an estimatedTimeToExpiration value ("hh:mm:ss"), None if absent"""
+    try:
+        hours, minutes, seconds = (int(part) for part in value.split(':'))
+        return hours * 3600 + minutes * 60 + seconds
+    except (AttributeError, ValueError):
+        return None
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (delta seconds or HTTP date), None if absent"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TableauClient:
+    """Thin wrapper around a pooled requests.Session for the Tableau REST API"""
+
+    def __init__(self, server, site_name, pat_name, pat_value, api_version=API_VERSION,
+                 timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX,
+                 pool_size=DEFAULT_POOL_SIZE, cache=None, cache_only=False,
+                 session_path=DEFAULT_SESSION_PATH, metrics=None):
+        self.server = server.rstrip('/')
+        self.site_name = site_name
+        self.pat_name = pat_name
+        self.pat_value = pat_value
+        self.api_version = api_version
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # Optional fetch_metrics.RequestMetrics fed with every request
+        self.metrics = metrics
+        # Optional http_cache.ResponseCache for GET requests; cache_only never touches the network
+        self.cache = cache
+        self.cache_only = cache_only
+
+        self.auth_token = None
+        self.site_id = None
+        # Saved token file (None disables reuse); auth_lock makes re-sign-in single-flight
+        self.session_path = session_path
+        self.auth_lock = threading.Lock()
+
+        # Keep-alive connections shared by every thread using this client
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+    @classmethod
+    def from_credentials(cls, creds=None, **kwargs):
+        creds = creds or get_credentials()
+        return cls(creds['SERVER'], creds['SITE_NAME'], creds['PAT_NAME'], creds['PAT_VALUE'], **kwargs)
+
+    def api_url(self, path):
+        """Build a full REST URL from a path relative to /api/{version}/"""
+        return f"{self.server}/api/{self.api_version}/{path.lstrip('/')}"
+
+    def _session_owner(self):
+        return {'server': self.server, 'site_name': self.site_name, 'pat_name': self.pat_name}
+
+    def _load_session(self):
+        """Saved token for this server/site/PAT if it is still valid, else None"""
+        if not self.session_path:
+            return None
+        try:
+            with open(self.session_path, 'r') as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if saved.get('owner') != self._session_owner():
+            return None
+        if saved.get('expires_at', 0) - TOKEN_EXPIRY_MARGIN <= time.time():
+            return None
+        return saved
+
+    def _save_session(self, expires_in):
+        if not self.session_path:
+            return
+        saved = {
+            'owner': self._session_owner(),
+            'token': self.auth_token,
+            'site_id': self.site_id,
+            'expires_at': time.time() + expires_in
+        }
+        # The token grants API access - keep the file private
+        fd = os.open(self.session_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(saved, f)
+
+    def sign_in(self, force=False):
+        """Sign in, reusing a saved token from an earlier run unless force is set"""
+        if self.cache_only:
+            # Offline: reuse the site id remembered by the last online run
+            self.site_id = self.cache.get_meta('site_id') if self.cache is not None else None
+            if not self.site_id:
+                raise CacheMiss("No cached site id - run once online with the cache enabled")
+            return None, self.site_id
+        
+        saved = None if force else self._load_session()
+        if saved:
+            self.auth_token = saved['token']
+            self.site_id = saved['site_id']
+        else:
+            payload = {
+                "credentials": {
+                    "personalAccessTokenName": self.pat_name,
+                    "personalAccessTokenSecret": self.pat_value,
+                    "site": {"contentUrl": self.site_name}
+                }
+            }
+            response = self.request('POST', 'auth/signin', json=payload, authenticated=False)
+            credentials = response.json()['credentials']
+            self.auth_token = credentials['token']
+            self.site_id = credentials['site']['id']
+            self._save_session(parse_expiration(credentials.get('estimatedTimeToExpiration')) or DEFAULT_TOKEN_TTL)
+        
+        if self.cache is not None:
+            self.cache.set_meta('site_id', self.site_id)
+        return self.auth_token, self.site_id
+
+    def _reauthenticate(self, stale_token):
+        """Sign in again after a 401; concurrent callers share one sign-in"""
+        with self.auth_lock:
+            # Another worker already replaced the token we were using
+            if self.auth_token != stale_token:
+                return
+            self.sign_in(force=True)
+
+    def _backoff_delay(self, attempt, response=None):
+        """Exponential backoff with full jitter, honouring Retry-After when the server sends it"""
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, path, params=None, json=None, headers=None, authenticated=True):
+        """Send a request, recording it in the metrics collector when one is configured"""
+        url = path if path.startswith('http') else self.api_url(path)
+        request_headers = dict(headers or {})
+        if authenticated and self.auth_token:
+            request_headers["X-Tableau-Auth"] = self.auth_token
+
+        outcome = {'status': 'error', 'retries': 0, 'cache': None, 'bytes': 0}
+        started = time.perf_counter()
+        try:
+            response = self._cached_send(method, url, params, json, request_headers, authenticated, outcome)
+            outcome['status'] = response.status_code
+            if outcome['cache'] != 'hit':
+                outcome['bytes'] = len(response.content)
+            return response
+        except requests.HTTPError as e:
+            outcome['status'] = e.response.status_code if e.response is not None else 'error'
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record(method, url, outcome['status'], time.perf_counter() - started,
+                                    outcome['bytes'], outcome['retries'], outcome['cache'])
+
+    def _cached_send(self, method, url, params, json, headers, authenticated, outcome):
+        """Serve GETs from the response cache when one is configured, else hit the network"""
+        if self.cache is None or method != 'GET':
+            return self._send(method, url, params, json, headers, authenticated, outcome)
+
+        cache_key = make_key(method, url, params)
+        cached = self.cache.get(cache_key)
+        if cached and (cached['fresh'] or self.cache_only):
+            outcome['cache'] = 'hit'
+            return cached['response']
+        outcome['cache'] = 'miss'
+        if self.cache_only:
+            raise CacheMiss(f"Not cached (cache-only mode): {cache_key}")
+
+        # Stale entry - let the server answer 304 if it supports validators
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self._send(method, url, params, json, headers, authenticated, outcome)
+        if response.status_code == 304 and cached:
+            outcome['cache'] = 'revalidated'
+            self.cache.touch(cache_key)
+            return cached['response']
+        self.cache.store(cache_key, response)
+        return response
+
+    def _send(self, method, url, params, json, headers, authenticated=True, outcome=None):
+        """Hit the network, retrying connection errors, 429s and 5xx responses
+        
+        An expired token (401) triggers one transparent re-sign-in and a retry.
+        """
+        outcome = outcome if outcome is not None else {}
+        attempt = 0
+        reauthenticated = False
+        while True:
+            outcome['retries'] = attempt
+            try:
+                response = self.session.request(method, url, params=params, json=json,
+                                                headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code == 401 and authenticated and not reauthenticated:
+                self._reauthenticate(headers.get("X-Tableau-Auth"))
+                headers = dict(headers, **{"X-Tableau-Auth": self.auth_token})
+                reauthenticated = True
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(self._backoff_delay(attempt, response))
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response
+
+    def get(self, path, params=None, headers=None):
+        return self.request('GET', path, params=params, headers=headers)
+
+    def get_json(self, path, params=None):
+        return self.get(path, params=params).json()
+
+    def get_all_pages(self, path, collection, item, params=None, page_size=100, max_workers=8):
+        """Fetch every page of a paginated REST listing and return the items in server order
+        
+        Page 1 reveals totalAvailable; the remaining pages are then fetched in parallel.
+        """
+        def fetch_page(page_number):
+            page_params = dict(params or {}, pageSize=page_size, pageNumber=page_number)
+            data = self.get_json(path, params=page_params)
+            items = (data.get(collection) or {}).get(item, [])
+            return data, items if isinstance(items, list) else [items]
+
+        first, items = fetch_page(1)
+        total_available = int((first.get('pagination') or {}).get('totalAvailable', 0) or 0)
+        total_pages = math.ceil(total_available / page_size) if items else 1
+        if total_pages <= 1:
+            return items
+
+        all_items = list(items)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total_pages - 1))) as executor:
+            for _, page_items in executor.map(fetch_page, range(2, total_pages + 1)):
+                all_items.extend(page_items)
+        return all_items
+
+    def post(self, path, json=None, headers=None):
+        return self.request('POST', path, json=json, headers=headers)
+
+    def metadata_query(self, query, variables=None):
+        """Run a Metadata API (GraphQL) query and return its data block"""
+        url = f"{self.server}/api/metadata/graphql"
+        body = self.post(url, json={"query": query, "variables": variables or {}}).json()
+        if body.get('errors'):
+            raise Exception(f"Metadata API error: {body['errors'][0].get('message', body['errors'])}")
+        return body.get('data', {})
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tableau Metadata API (GraphQL) backend for fetch_enhanced_dashboard_data.py
+Returns the same workbook, view and data source shapes as the REST path
+"""
+
+WORKBOOKS_QUERY = """
+query RocWorkbooks($projects: [String], $first: Int, $after: String) {
+  workbooksConnection(filter: {projectNameWithin: $projects}, first: $first, after: $after) {
+    nodes {
+      luid
+      name
+      description
+      projectName
+      createdAt
+      updatedAt
+      owner { username }
+      tags { name }
+      sheets { luid name path }
+      dashboards { luid name path }
+      embeddedDatasources {
+        name
+        upstreamDatasources { luid name }
+        upstreamDatabases { connectionType hostName }
+      }
+    }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+def query_workbooks(client, project_names, batch_size=100):
+    """Page through workbooksConnection for the given projects"""
+    nodes = []
+    after = None
+
+    while True:
+        variables = {"projects": list(project_names), "first": batch_size, "after": after}
+        data = client.metadata_query(WORKBOOKS_QUERY, variables)
+        connection = data.get('workbooksConnection', {})
+        nodes.extend(connection.get('nodes', []))
+
+        page_info = connection.get('pageInfo', {})
+        if not page_info.get('hasNextPage'):
+            break
+        after = page_info.get('endCursor')
+
+    return nodes
+
+def to_rest_workbook(node):
+    """Shape a GraphQL workbook node like a REST workbook listing entry"""
+    return {
+        'id': node.get('luid', ''),
+        'name': node.get('name', 'Unnamed'),
+        'description': node.get('description') or '',
+        'project': {'name': node.get('projectName', 'Unknown')},
+        'owner': {'name': (node.get('owner') or {}).get('username', 'Unknown')},
+        'createdAt': node.get('createdAt', ''),
+        'updatedAt': node.get('updatedAt', ''),
+        'tags': {'tag': [{'label': t.get('name', '')} for t in node.get('tags') or []]},
+        # The Metadata API doesn't expose workbook size
+        'size': 0
+    }
+
+def build_views(client, node, rest_views):
+    """Views from the workbook's sheets and dashboards, with usage joined from the REST sweep"""
+    view_data = []
+    seen = set()
+
+    for sheet in (node.get('dashboards') or []) + (node.get('sheets') or []):
+        luid = sheet.get('luid')
+        # Hidden sheets have no luid and aren't views on the server
+        if not luid or luid in seen:
+            continue
+        seen.add(luid)
+
+        rest_view = rest_views.get(luid)
+        if rest_view:
+            view_data.append(dict(rest_view))
+        elif sheet.get('path'):
+            view_data.append({
+                'name': sheet.get('name', 'Unnamed'),
+                'id': luid,
+                'url': f"{client.server}/#/views/{sheet['path'].replace('/sheets/', '/')}",
+                'viewCount': 0
+            })
+
+    # Sort views by view count (most viewed first)
+    view_data.sort(key=lambda x: int(x.get('viewCount', 0) or 0), reverse=True)
+
+    return view_data
+
+def build_data_sources(node):
+    """Data sources like the REST connections path: published datasource name, else embedded"""
+    data_sources = []
+    seen = set()
+
+    for embedded in node.get('embeddedDatasources') or []:
+        databases = embedded.get('upstreamDatabases') or [{}]
+        published = embedded.get('upstreamDatasources') or []
+
+        if published:
+            entries = [(ds.get('name', ''), 'sqlproxy', '', ds.get('luid', '')) for ds in published]
+        else:
+            entries = [(embedded.get('name', ''), databases[0].get('connectionType', 'Unknown'),
+                        databases[0].get('hostName', ''), '')]
+
+        for ds_name, ds_type, server_address, ds_id in entries:
+            if ds_name and ds_name not in seen:
+                data_sources.append({
+                    'name': ds_name,
+                    'type': ds_type,
+                    'server': server_address,
+                    'id': ds_id
+                })
+                seen.add(ds_name)
+
+    return data_sources
+
+def get_workbooks_by_project_names(client, project_names, site_views=None):
+    """Workbooks grouped by project name, plus {workbook id: (views, data_sources)}
+
+    site_views is the REST bulk sweep ({workbook id: view records}) used for view counts.
+    """
+    rest_views = {}
+    for views in (site_views or {}).values():
+        for view in views:
+            rest_views[view['id']] = view
+
+    by_project = {name: [] for name in project_names}
+    details = {}
+    for node in query_workbooks(client, project_names):
+        wb = to_rest_workbook(node)
+        project_name = wb['project']['name']
+        if project_name in by_project:
+            by_project[project_name].append(wb)
+            details[wb['id']] = (build_views(client, node, rest_views), build_data_sources(node))
+
+    return by_project, details
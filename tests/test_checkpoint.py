@@ -0,0 +1,43 @@
+"""Resuming fetch_enhanced_dashboard_data.py from an interrupted NDJSON checkpoint"""
+import json
+
+from fetch_enhanced_dashboard_data import compact_checkpoint, load_checkpoint_ids, open_checkpoint
+
+def record(workbook_id, category='production'):
+    return {'id': workbook_id, 'category': category,
+            'record': {'id': workbook_id, 'url': f'https://tableau/{workbook_id}', 'updated': workbook_id}}
+
+def test_resume_after_torn_line(tmp_path):
+    path = tmp_path / 'out.json.checkpoint.ndjson'
+    # The run died halfway through writing wb-2
+    path.write_text(json.dumps(record('wb-1')) + '\n' + json.dumps(record('wb-2'))[:25])
+
+    assert load_checkpoint_ids(path) == {'wb-1'}
+
+    with open_checkpoint(path, resume=True) as checkpoint:
+        for workbook_id in ('wb-2', 'wb-3'):
+            checkpoint.write(json.dumps(record(workbook_id)) + '\n')
+
+    assert load_checkpoint_ids(path) == {'wb-1', 'wb-2', 'wb-3'}
+    workbooks = [{'id': workbook_id} for workbook_id in ('wb-1', 'wb-2', 'wb-3')]
+    compacted = compact_checkpoint(path, {'production': workbooks})
+    assert sorted(r['id'] for r in compacted['production']) == ['wb-1', 'wb-2', 'wb-3']
+
+def test_resume_keeps_complete_checkpoint(tmp_path):
+    path = tmp_path / 'out.json.checkpoint.ndjson'
+    text = json.dumps(record('wb-1')) + '\n'
+    path.write_text(text)
+
+    with open_checkpoint(path, resume=True):
+        pass
+
+    assert path.read_text() == text
+
+def test_compact_warns_about_unreadable_lines(tmp_path, capsys):
+    path = tmp_path / 'out.json.checkpoint.ndjson'
+    path.write_text(json.dumps(record('wb-1')) + '\n{"id": "wb-2", "categ\n')
+
+    compacted = compact_checkpoint(path, {'production': [{'id': 'wb-1'}, {'id': 'wb-2'}]})
+
+    assert [r['id'] for r in compacted['production']] == ['wb-1']
+    assert 'Skipped 1 unreadable lines' in capsys.readouterr().out
@@ -0,0 +1,40 @@
+"""view_history.py keeps view ids lined up with the column files across reloads"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from view_history import DAY, ViewHistory, record_history
+
+def workbook(*views):
+    return {'views': [{'id': view_id, 'viewCount': count} for view_id, count in views]}
+
+def stored_counts(directory):
+    history = ViewHistory(directory)
+    latest = history.latest_counts()
+    return {view_id: int(latest[i]) for i, view_id in enumerate(history.view_ids)}
+
+def test_empty_view_ids_are_not_stored(tmp_path):
+    now = 1_700_000_000
+    records = [workbook(('v-a', 10), ('', 99), ('  ', 98), ('v-b', 20)), workbook(('v-c', 30))]
+    record_history(records, tmp_path, now)
+
+    assert stored_counts(tmp_path) == {'v-a': 10, 'v-b': 20, 'v-c': 30}
+
+    # Later runs still map every id to its own counts
+    records = [workbook(('v-a', 15), ('', 5), ('v-b', 20)), workbook(('v-c', 31), ('v-d', 1))]
+    record_history(records, tmp_path, now + DAY)
+
+    assert stored_counts(tmp_path) == {'v-a': 15, 'v-b': 20, 'v-c': 31, 'v-d': 1}
+    assert records[0]['trend']['views_7d'] == 5
+    assert records[1]['trend']['views_7d'] == 1
+
+def test_blank_line_in_existing_history_keeps_its_position(tmp_path):
+    history = ViewHistory(tmp_path)
+    history.append({'v-a': 1, 'v-b': 2}, 1_700_000_000)
+    # An older run stored an empty id between v-b and v-c
+    with open(tmp_path / 'views.txt', 'a') as f:
+        f.write('\n')
+    history = ViewHistory(tmp_path)
+    history.append({'v-c': 3}, 1_700_000_000)
+
+    assert stored_counts(tmp_path) == {'v-a': 1, 'v-b': 2, '': -1, 'v-c': 3}
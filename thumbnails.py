@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Preview thumbnails for the dashboard cards
+Downloads each workbook's top view previewImage through a bounded pool, downscales it and
+stores it under a content-hash filename, so unchanged images keep their URL (and cache entry).
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:
+    # Without Pillow the PNGs from Tableau are stored as-is
+    Image = None
+
+DEFAULT_THUMBNAIL_DIR = 'thumbnails'
+DEFAULT_THUMBNAIL_WIDTH = 480
+DEFAULT_THUMBNAIL_CONCURRENCY = 4
+MANIFEST_NAME = 'manifest.json'
+THUMBNAIL_FILE = re.compile(r'^[0-9a-f]{16}\.(webp|jpg|png)$')
+
+def png_size(data):
+    """(width, height) from a PNG IHDR chunk, or (None, None)"""
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and data[12:16] == b'IHDR':
+        return struct.unpack('>II', data[16:24])
+    return None, None
+
+def downscale(data, max_width=DEFAULT_THUMBNAIL_WIDTH):
+    """Re-encode a preview image -> (bytes, extension, width, height)"""
+    if Image is None:
+        width, height = png_size(data)
+        return data, '.png', width, height
+
+    image = Image.open(io.BytesIO(data))
+    image = image.convert('RGB')
+    if image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+
+    output = io.BytesIO()
+    try:
+        image.save(output, 'WEBP', quality=75, method=6)
+        extension = '.webp'
+    except (KeyError, OSError):
+        # Pillow built without libwebp
+        output = io.BytesIO()
+        image.save(output, 'JPEG', quality=80, optimize=True, progressive=True)
+        extension = '.jpg'
+    return output.getvalue(), extension, image.width, image.height
+
+def load_manifest(directory):
+    """{view id: {'updated', 'file', 'width', 'height'}} from the last run"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def download_thumbnail(client, site_id, record, directory, max_width):
+    """Fetch, downscale and store the preview of a record's top view -> manifest entry"""
+    view = record['views'][0]
+    response = client.get(f"sites/{site_id}/workbooks/{record['id']}/views/{view['id']}/previewImage")
+    data, extension, width, height = downscale(response.content, max_width)
+
+    filename = hashlib.sha256(data).hexdigest()[:16] + extension
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        # Identical images (placeholders) share a path - each download needs its own temp file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{filename}.", suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return {'updated': record['updated'], 'file': filename, 'width': width, 'height': height}
+
+def add_thumbnails(client, site_id, records, directory=DEFAULT_THUMBNAIL_DIR, max_width=DEFAULT_THUMBNAIL_WIDTH,
+                   max_workers=DEFAULT_THUMBNAIL_CONCURRENCY):
+    """Set record['thumbnail'] = {'src', 'width', 'height'} for every record with views
+
+    Views whose workbook updatedAt matches the manifest are not downloaded again. Images no
+    longer referenced by any record are removed. src is relative to the page - the folder is
+    deployed next to it under its own name, wherever it is kept locally. Returns
+    (downloaded, reused, failed).
+    """
+    os.makedirs(directory, exist_ok=True)
+    previous = load_manifest(directory)
+    manifest = {}
+    todo = []
+    reused = 0
+
+    for record in records:
+        if not record.get('views'):
+            continue
+        view_id = record['views'][0]['id']
+        entry = previous.get(view_id)
+        if entry and entry['updated'] == record['updated'] and os.path.exists(os.path.join(directory, entry['file'])):
+            manifest[view_id] = entry
+            reused += 1
+        else:
+            todo.append(record)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [(record, executor.submit(download_thumbnail, client, site_id, record, directory, max_width))
+                   for record in todo]
+        for record, future in futures:
+            try:
+                manifest[record['views'][0]['id']] = future.result()
+            except Exception as e:
+                print(f"  ⚠️  No thumbnail for {record['name']}: {e}")
+                failed += 1
+                # A stale image beats none (e.g. offline with --cache-only)
+                stale = previous.get(record['views'][0]['id'])
+                if stale and os.path.exists(os.path.join(directory, stale['file'])):
+                    manifest[record['views'][0]['id']] = stale
+
+    url_prefix = os.path.basename(directory.rstrip('/'))
+    for record in records:
+        entry = manifest.get(record['views'][0]['id']) if record.get('views') else None
+        if entry:
+            record['thumbnail'] = {'src': f"{url_prefix}/{entry['file']}",
+                                   'width': entry['width'], 'height': entry['height']}
+
+    referenced = {entry['file'] for entry in manifest.values()}
+    for filename in os.listdir(directory):
+        if THUMBNAIL_FILE.match(filename) and filename not in referenced:
+            os.remove(os.path.join(directory, filename))
+    save_manifest(directory, manifest)
+    return len(todo) - failed, reused, failed
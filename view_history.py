@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Append-only view-count history and trend analytics for the dashboard catalog
+Every fetch appends (view, timestamp, count) rows for the views whose count changed to three
+column files; trends for all views are then computed at once with NumPy.
+
+    view_history/
+        views.txt     one view id per line - the line number is the view index (ids that are
+                      blank or span lines, e.g. of unpublished sheets, are not stored)
+        view.i4       int32 view index per row
+        ts.i8         int64 unix timestamp per row
+        count.i8      int64 cumulative view count per row
+
+Only changes are stored, so the row at or before a cutoff still holds the count at the cutoff
+and a view's last row is its last change.
+"""
+import os
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional - without it the fetcher simply keeps no history
+    np = None
+
+DEFAULT_HISTORY_DIR = 'view_history'
+WINDOWS = (7, 30)
+STALE_DAYS = 30
+DAY = 86400
+
+COLUMNS = (('view', 'view.i4', '<i4'), ('ts', 'ts.i8', '<i8'), ('count', 'count.i8', '<i8'))
+
+def is_storable_id(view_id):
+    """A view id that fits on exactly one non-blank line of views.txt"""
+    return isinstance(view_id, str) and view_id.strip() != '' and view_id.splitlines() == [view_id]
+
+class ViewHistory:
+    def __init__(self, directory=DEFAULT_HISTORY_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self._path('views.txt'), 'r') as f:
+                # By line, not by whitespace - the line number is the index
+                self.view_ids = f.read().splitlines()
+        except FileNotFoundError:
+            self.view_ids = []
+        self.index = {view_id: i for i, view_id in enumerate(self.view_ids)}
+
+        columns = {}
+        for name, filename, dtype in COLUMNS:
+            path = self._path(filename)
+            columns[name] = np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype)
+        # An interrupted append can leave the columns uneven - drop the partial row, on disk too,
+        # or the next append would land after it and misalign every later row
+        rows = min(len(column) for column in columns.values())
+        for name, filename, dtype in COLUMNS:
+            path = self._path(filename)
+            size = rows * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                os.truncate(path, size)
+        self.view = columns['view'][:rows]
+        self.ts = columns['ts'][:rows]
+        self.count = columns['count'][:rows]
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def __len__(self):
+        return len(self.ts)
+
+    def latest_counts(self):
+        """Last stored count per view index (-1 for views never stored)"""
+        latest = np.full(len(self.view_ids), -1, dtype=np.int64)
+        order = np.lexsort((self.ts, self.view))
+        # Assigning in (view, ts) order leaves the newest count for each view
+        latest[self.view[order]] = self.count[order]
+        return latest
+
+    def append(self, counts, timestamp=None):
+        """Store {view id: count} rows whose count differs from the last stored one -> rows added"""
+        timestamp = int(timestamp or time.time())
+        counts = {view_id: count for view_id, count in counts.items() if is_storable_id(view_id)}
+        new_ids = [view_id for view_id in counts if view_id not in self.index]
+        if new_ids:
+            with open(self._path('views.txt'), 'a') as f:
+                f.write(''.join(f"{view_id}\n" for view_id in new_ids))
+            for view_id in new_ids:
+                self.index[view_id] = len(self.view_ids)
+                self.view_ids.append(view_id)
+
+        indices = np.fromiter((self.index[view_id] for view_id in counts), dtype='<i4', count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        changed = self.latest_counts()[indices] != values
+        rows = {'view': indices[changed], 'ts': np.full(int(changed.sum()), timestamp, dtype=np.int64),
+                'count': values[changed]}
+
+        for name, filename, dtype in COLUMNS:
+            with open(self._path(filename), 'ab') as f:
+                rows[name].astype(dtype).tofile(f)
+        self.view = np.concatenate([self.view, rows['view']])
+        self.ts = np.concatenate([self.ts, rows['ts']])
+        self.count = np.concatenate([self.count, rows['count']])
+        return int(changed.sum())
+
+    def trends(self, now=None):
+        """Per view index: new views and views/day over each window, first seen and last change
+
+        Returns a dict of arrays indexed by view index.
+        """
+        now = int(now or time.time())
+        n_views = len(self.view_ids)
+        result = {'first_seen': np.zeros(n_views, dtype=np.int64), 'last_change': np.zeros(n_views, dtype=np.int64)}
+        if not len(self):
+            for days in WINDOWS:
+                result[f"views_{days}d"] = np.zeros(n_views, dtype=np.int64)
+                result[f"per_day_{days}d"] = np.zeros(n_views)
+            return result
+
+        order = np.lexsort((self.ts, self.view))
+        view, ts, count = self.view[order], self.ts[order], self.count[order]
+        starts = np.flatnonzero(np.r_[True, view[1:] != view[:-1]])
+        ends = np.r_[starts[1:], len(view)] - 1
+        present = view[starts]
+        positions = np.arange(len(view))
+
+        latest = count[ends]
+        result['first_seen'][present] = ts[starts]
+        result['last_change'][present] = ts[ends]
+
+        for days in WINDOWS:
+            cutoff = now - days * DAY
+            # Last row at or before the cutoff; views first seen after it start from their first row
+            eligible = np.where(ts <= cutoff, positions, -1)
+            base_position = np.maximum.reduceat(eligible, starts)
+            base_position = np.where(base_position < 0, starts, base_position)
+
+            # Counts only go down when a view is republished - don't report that as negative usage
+            gained = np.maximum(latest - count[base_position], 0)
+            observed_days = np.clip((now - np.maximum(ts[base_position], cutoff)) / DAY, 1, days)
+
+            views = np.zeros(n_views, dtype=np.int64)
+            per_day = np.zeros(n_views)
+            views[present] = gained
+            per_day[present] = gained / observed_days
+            result[f"views_{days}d"] = views
+            result[f"per_day_{days}d"] = per_day
+        return result
+
+def record_history(records, directory=DEFAULT_HISTORY_DIR, now=None):
+    """Append this run's view counts and write a 'trend' summary into every record -> rows added
+
+    Returns None (and leaves the records alone) when NumPy is not installed.
+    """
+    if np is None:
+        return None
+    now = int(now or time.time())
+    history = ViewHistory(directory)
+    # Views without a usable id have no history and are left out of the trends
+    pairs = [(i, view) for i, record in enumerate(records) for view in record.get('views', [])
+             if is_storable_id(view.get('id'))]
+    counts = {}
+    for _, view in pairs:
+        counts[view['id']] = int(view.get('viewCount', 0) or 0)
+    added = history.append(counts, now)
+
+    trends = history.trends(now)
+    # Flatten (record, view) pairs so the per-workbook rollup is a handful of array operations
+    record_of = np.array([i for i, _ in pairs], dtype=np.int64)
+    view_of = np.array([history.index[view['id']] for _, view in pairs], dtype=np.int64)
+    rollup = {}
+    for days in WINDOWS:
+        for key in (f"views_{days}d", f"per_day_{days}d"):
+            rollup[key] = np.bincount(record_of, weights=trends[key][view_of], minlength=len(records))
+    first_seen = np.full(len(records), np.iinfo(np.int64).max)
+    last_change = np.zeros(len(records), dtype=np.int64)
+    np.minimum.at(first_seen, record_of, trends['first_seen'][view_of])
+    np.maximum.at(last_change, record_of, trends['last_change'][view_of])
+
+    stale_before = now - STALE_DAYS * DAY
+    has_views = np.bincount(record_of, minlength=len(records)) > 0
+    for i in np.flatnonzero(has_views):
+        trend = {}
+        for days in WINDOWS:
+            trend[f"views_{days}d"] = int(rollup[f"views_{days}d"][i])
+            trend[f"per_day_{days}d"] = round(float(rollup[f"per_day_{days}d"][i]), 2)
+        trend['history_days'] = round((now - int(first_seen[i])) / DAY, 1)
+        # Stale: nobody opened any of its views for STALE_DAYS (which also needs that much history)
+        trend['stale'] = bool(last_change[i] <= stale_before)
+        records[i]['trend'] = trend
+    return added
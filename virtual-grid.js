@@ -0,0 +1,335 @@
+// Windowed dashboard grids for roc_dashboards_enhanced.html (generate_enhanced_html.py --mode virtual)
+// Cards live in the #catalog-data JSON; only the rows in or near the viewport are in the DOM,
+// the rest of each grid is top/bottom padding sized from measured (or estimated) row heights.
+(function () {
+    const catalog = JSON.parse(document.getElementById('catalog-data').textContent);
+    // Matching runs in a Web Worker (search-worker.js) when the browser allows it
+    const searchClient = createSearchClient({ json: document.getElementById('search-index').textContent }, 'search-worker.js');
+    const OVERSCAN_PX = 1000;
+    const ESTIMATED_CARD_PX = 420;
+
+    const searchInput = document.getElementById('searchInput');
+    const filterButtons = document.querySelectorAll('.filter-btn');
+    const sortSelect = document.getElementById('sortSelect');
+    const noResults = document.getElementById('no-results');
+
+    let currentFilter = 'all';
+    // Card ids in relevance order from the last search, or null when the search box is empty
+    let ranked = null;
+    let frameRequested = false;
+
+    function escapeHtml(value) {
+        return String(value).replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[c]);
+    }
+
+    function fullUrl(path) {
+        return /^https?:/.test(path) ? path : catalog.base + path;
+    }
+
+    function formatCount(value) {
+        return Number(value).toLocaleString('en-US');
+    }
+
+    // kind marks a lazy panel that panels.js fills on first open
+    function collapsible(title, inner, kind) {
+        return `
+            <div class="collapsible-section"${kind ? ` data-panel="${kind}"` : ''}>
+                <div class="collapsible-header" onclick="toggleSection(this)">
+                    <span class="collapsible-title">${title}</span>
+                    <span class="toggle-icon">▼</span>
+                </div>
+                <div class="collapsible-content">
+                    <div class="collapsible-inner">${inner}</div>
+                </div>
+            </div>`;
+    }
+
+    // Same markup as generate_card() in the static page
+    function renderCard(card, category) {
+        const description = card.d || 'No description available';
+        const url = fullUrl(card.l);
+        const parts = [`
+            <div class="dashboard-card" data-category="${category}"${card.pn ? ` data-panels="${escapeHtml(card.pn)}"` : ''}>`];
+
+        if (card.th) {
+            const [src, width, height] = card.th;
+            const size = width ? ` width="${width}" height="${height}"` : '';
+            parts.push(`<a href="${escapeHtml(url)}" class="dashboard-thumbnail" target="_blank" tabindex="-1">` +
+                       `<img src="${escapeHtml(src)}" alt=""${size} loading="lazy" decoding="async"></a>`);
+        }
+        parts.push(`<div class="dashboard-name">${escapeHtml(card.n)}</div>
+                <div class="dashboard-description ${card.d ? '' : 'empty'}">${escapeHtml(description)}</div>`);
+        if (card.t.length) {
+            parts.push('<div class="tags">' + card.t.map(tag => `<span class="tag">🏷️ ${escapeHtml(tag)}</span>`).join('') + '</div>');
+        }
+        parts.push(`
+                <div class="dashboard-meta">
+                    <div class="meta-item"><span class="icon">👤</span> ${escapeHtml(card.o)}</div>
+                    <div class="meta-item"><span class="icon">📁</span> ${escapeHtml(card.p)}</div>
+                    <div class="meta-item"><span class="icon">📊</span> ${card.s} sheets</div>
+                    <div class="meta-item"><span class="icon">👁</span> <span class="meta-highlight">${formatCount(card.v)}</span> views</div>
+                </div>
+                <div class="dashboard-meta">
+                    <div class="meta-item"><span class="icon">📅</span> Created: ${card.c}</div>
+                    <div class="meta-item"><span class="icon">🔄</span> Updated: ${card.u}</div>
+                </div>`);
+        if (card.tr) {
+            const [views7, views30, perDay30, stale] = card.tr;
+            parts.push(`
+                <div class="dashboard-meta">
+                    <div class="meta-item"><span class="icon">📈</span> <span class="meta-trend">+${formatCount(views7)}</span> this week</div>
+                    <div class="meta-item"><span class="icon">🗓</span> +${formatCount(views30)} this month (${perDay30}/day)</div>
+                    ${stale ? '<span class="stale-badge">💤 Stale</span>' : ''}
+                </div>`);
+        }
+        if (card.pn) {
+            if (card.dc) parts.push(collapsible(`🗄️ Data Sources (${card.dc})`, '', 'sources'));
+            if (card.vc) parts.push(collapsible(`📑 Sheets (${card.vc})`, '', 'sheets'));
+        }
+        if (card.ds && card.ds.length) {
+            const items = card.ds.map(([name, type]) => {
+                const badge = type.toLowerCase().includes('vertica') ? 'vertica'
+                    : type.toLowerCase().includes('bigquery') ? 'bigquery' : 'other';
+                return `<div class="data-source"><span class="ds-badge ${badge}">${escapeHtml(type)}</span>${escapeHtml(name)}</div>`;
+            });
+            parts.push(collapsible(`🗄️ Data Sources (${card.ds.length})`, items.join('')));
+        }
+        if (card.vw && card.vw.length) {
+            const links = card.vw.map(([name, path, count]) => {
+                const countDisplay = count > 0 ? ` <span class="view-count">(${formatCount(count)}👁)</span>` : '';
+                return `<a href="${escapeHtml(fullUrl(path))}" class="view-link" target="_blank">${escapeHtml(name)}${countDisplay}</a>`;
+            });
+            parts.push(collapsible(`📑 Sheets (${card.vw.length})`, `<div class="view-links">${links.join('')}</div>`));
+        }
+        parts.push(`
+                <a href="${escapeHtml(url)}" class="dashboard-link" target="_blank">
+                    View Dashboard <span>→</span>
+                </a>
+            </div>
+`);
+        return parts.join('');
+    }
+
+    const sortKeys = {
+        updated: card => card.U,
+        views: card => card.v,
+        views7: card => card.tr ? card.tr[0] : 0,
+        views30: card => card.tr ? card.tr[1] : 0,
+        stale: card => -(card.tr ? card.tr[1] : card.v)
+    };
+
+    // Card ids follow page order (production, then playground), as in the search index
+    let nextId = 0;
+    const sections = ['production', 'playground'].map(category => {
+        const cards = catalog[category];
+        cards.forEach(card => {
+            card.id = nextId++;
+            card.height = 0;
+        });
+        return {
+            category,
+            cards,
+            visible: cards,
+            element: document.querySelector(`.section[data-section="${category}"]`),
+            grid: document.getElementById(`${category}-grid`),
+            count: document.getElementById(`${category}-count`),
+            elements: new Map(),
+            width: 0,
+            columns: 1,
+            window: null
+        };
+    });
+
+    function rowHeight(section, row, estimate) {
+        let height = 0;
+        const end = Math.min(section.visible.length, (row + 1) * section.columns);
+        for (let i = row * section.columns; i < end; i++) {
+            height = Math.max(height, section.visible[i].height || estimate);
+        }
+        return height + section.gap;
+    }
+
+    // Render the rows of one grid that intersect the viewport (plus overscan); returns true when
+    // freshly measured heights moved things around and another pass is needed
+    function layoutSection(section) {
+        const style = getComputedStyle(section.grid);
+        const width = section.grid.clientWidth;
+        if (width !== section.width) {
+            // Card heights depend on the column width
+            section.width = width;
+            section.cards.forEach(card => { card.height = 0; });
+            section.elements = new Map();
+            section.window = null;
+        }
+        section.columns = Math.max(1, style.gridTemplateColumns.split(' ').length);
+        section.gap = parseFloat(style.rowGap) || 0;
+
+        const measured = section.visible.filter(card => card.height);
+        const estimate = measured.length
+            ? measured.reduce((sum, card) => sum + card.height, 0) / measured.length
+            : ESTIMATED_CARD_PX;
+        const rows = Math.ceil(section.visible.length / section.columns);
+
+        let y = section.grid.getBoundingClientRect().top;
+        let first = -1, last = -1, before = 0, after = 0;
+        for (let row = 0; row < rows; row++) {
+            const height = rowHeight(section, row, estimate);
+            if (y + height >= -OVERSCAN_PX && y <= window.innerHeight + OVERSCAN_PX) {
+                if (first < 0) first = row;
+                last = row;
+            } else if (first < 0) {
+                before += height;
+            } else {
+                after += height;
+            }
+            y += height;
+        }
+
+        const key = `${first}:${last}:${section.columns}`;
+        if (key === section.window) {
+            return false;
+        }
+        section.window = key;
+        section.grid.style.paddingTop = `${before}px`;
+        section.grid.style.paddingBottom = `${after}px`;
+
+        const start = first < 0 ? 0 : first * section.columns;
+        const end = first < 0 ? 0 : Math.min(section.visible.length, (last + 1) * section.columns);
+        const slice = section.visible.slice(start, end);
+
+        // Cards that stay in the window keep their element (and any expanded section)
+        const elements = new Map();
+        const fresh = slice.filter(card => !section.elements.has(card));
+        const template = document.createElement('template');
+        template.innerHTML = fresh.map(card => renderCard(card, section.category)).join('');
+        const created = Array.from(template.content.children);
+        fresh.forEach((card, i) => elements.set(card, created[i]));
+        slice.forEach(card => {
+            if (!elements.has(card)) elements.set(card, section.elements.get(card));
+        });
+        section.elements = elements;
+        section.grid.replaceChildren(...slice.map(card => elements.get(card)));
+
+        let changed = false;
+        slice.forEach(card => {
+            const height = elements.get(card).offsetHeight;
+            if (Math.abs(height - card.height) > 1) {
+                card.height = height;
+                changed = true;
+            }
+        });
+        return changed;
+    }
+
+    function layout() {
+        frameRequested = false;
+        // A few passes let estimated heights settle into measured ones
+        for (let pass = 0; pass < 3; pass++) {
+            let changed = false;
+            sections.forEach(section => {
+                if (section.element.style.display !== 'none' && layoutSection(section)) {
+                    section.window = null;
+                    changed = true;
+                }
+            });
+            if (!changed) break;
+        }
+    }
+
+    function scheduleLayout() {
+        if (!frameRequested) {
+            frameRequested = true;
+            requestAnimationFrame(layout);
+        }
+    }
+
+    function updateDisplay() {
+        const rank = ranked && new Map(ranked.map((id, position) => [id, position]));
+        const key = sortKeys[sortSelect ? sortSelect.value : 'updated'];
+        let visibleCount = 0;
+
+        sections.forEach(section => {
+            const matches = currentFilter === 'all' || currentFilter === section.category;
+            if (!matches) {
+                section.visible = [];
+            } else if (rank) {
+                section.visible = section.cards.filter(card => rank.has(card.id))
+                    .sort((a, b) => rank.get(a.id) - rank.get(b.id));
+            } else {
+                // Stable sort, so ties keep the most-recently-updated order
+                section.visible = section.cards
+                    .map((card, i) => [key(card), i, card])
+                    .sort((a, b) => a[0] < b[0] ? 1 : a[0] > b[0] ? -1 : a[1] - b[1])
+                    .map(entry => entry[2]);
+            }
+            section.count.textContent = section.visible.length;
+            section.element.style.display = matches ? 'block' : 'none';
+            section.window = null;
+            visibleCount += section.visible.length;
+        });
+
+        noResults.style.display = visibleCount === 0 ? 'block' : 'none';
+        scheduleLayout();
+    }
+
+    // Toggle collapsible sections - the card grows, so its row is measured again (also once a
+    // lazy panel's list has arrived)
+    window.toggleSection = function (header) {
+        const content = header.nextElementSibling;
+        const icon = header.querySelector('.toggle-icon');
+        content.classList.toggle('open');
+        icon.classList.toggle('open');
+        if (content.classList.contains('open')) {
+            fillPanel(header).then(() => {
+                sections.forEach(section => { section.window = null; });
+                scheduleLayout();
+            });
+        }
+    };
+
+    document.addEventListener('transitionend', event => {
+        if (event.target.classList.contains('collapsible-content')) {
+            sections.forEach(section => { section.window = null; });
+            scheduleLayout();
+        }
+    });
+
+    let searchTimer = null;
+    searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => {
+            searchClient.query(searchInput.value, ids => {
+                ranked = ids;
+                updateDisplay();
+            });
+        }, 80);
+    });
+
+    filterButtons.forEach(button => {
+        button.addEventListener('click', () => {
+            filterButtons.forEach(btn => btn.classList.remove('active'));
+            button.classList.add('active');
+            currentFilter = button.dataset.filter;
+            updateDisplay();
+        });
+    });
+
+    if (sortSelect) {
+        sortSelect.addEventListener('change', updateDisplay);
+    }
+
+    window.addEventListener('scroll', scheduleLayout, { passive: true });
+    window.addEventListener('resize', scheduleLayout);
+
+    // Keyboard shortcut for search
+    document.addEventListener('keydown', (e) => {
+        if ((e.metaKey || e.ctrlKey) && e.key === 'k') {
+            e.preventDefault();
+            searchInput.focus();
+        }
+    });
+
+    updateDisplay();
+})();